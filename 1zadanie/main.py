@@ -2,17 +2,15 @@
 import sys
 from pathlib import Path
 from PyQt5.QtWidgets import QApplication, QMainWindow, QFileDialog, QMessageBox
-from PyQt5.uic import loadUi
 
+from numbers_analysis_ui import Ui_MainWindow
 
-class NumberAnalyzer(QMainWindow):
+
+class NumberAnalyzer(QMainWindow, Ui_MainWindow):
     def __init__(self):
         super().__init__()
 
-        ui_file = Path(__file__).parent / "numbers_analysis.ui"
-        if not ui_file.exists():
-            raise FileNotFoundError(f"Не найден файл: {ui_file}")
-        loadUi(str(ui_file), self)
+        self.setupUi(self)
 
         self.current_directory = str(Path.cwd())
 
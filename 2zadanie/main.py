@@ -2,17 +2,15 @@
 import sys
 from pathlib import Path
 from PyQt5.QtWidgets import QApplication, QMainWindow, QFileDialog, QMessageBox
-from PyQt5.uic import loadUi
 
+from editor_ui import Ui_MainWindow
 
-class TextEditor(QMainWindow):
+
+class TextEditor(QMainWindow, Ui_MainWindow):
     def __init__(self):
         super().__init__()
 
-        ui_file = Path(__file__).parent / "editor.ui"
-        if not ui_file.exists():
-            raise FileNotFoundError(f"Не найден файл: {ui_file}")
-        loadUi(str(ui_file), self)
+        self.setupUi(self)
 
         self.current_file = None
         self.is_modified = False  
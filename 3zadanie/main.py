@@ -4,17 +4,15 @@ from pathlib import Path
 from PyQt5.QtWidgets import QApplication, QMainWindow, QFileDialog, QMessageBox
 from PyQt5.QtGui import QPixmap, QImage, qRgb
 from PyQt5.QtCore import Qt
-from PyQt5.uic import loadUi
 
+from image_edit_ui import Ui_MainWindow
 
-class ImageEditor(QMainWindow):
+
+class ImageEditor(QMainWindow, Ui_MainWindow):
     def __init__(self):
         super().__init__()
 
-        ui_file = Path(__file__).parent / "image_edit.ui"
-        if not ui_file.exists():
-            raise FileNotFoundError(f"Не найден файл: {ui_file}")
-        loadUi(str(ui_file), self)
+        self.setupUi(self)
 
         self.original_image = None  
         self.rotation_count = 0    
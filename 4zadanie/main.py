@@ -4,17 +4,15 @@ from pathlib import Path
 from PyQt5.QtWidgets import QApplication, QMainWindow, QFileDialog, QMessageBox
 from PyQt5.QtGui import QPixmap, QImage
 from PyQt5.QtCore import Qt
-from PyQt5.uic import loadUi
 
+from transparency_ui import Ui_MainWindow
 
-class TransparencyEditor(QMainWindow):
+
+class TransparencyEditor(QMainWindow, Ui_MainWindow):
     def __init__(self):
         super().__init__()
 
-        ui_file = Path(__file__).parent / "transparency.ui"
-        if not ui_file.exists():
-            raise FileNotFoundError(f"Не найден файл: {ui_file}")
-        loadUi(str(ui_file), self)
+        self.setupUi(self)
 
         self.original_pixmap = None
         self.current_opacity = 1.0  # от 0.0 до 1.0
@@ -0,0 +1,145 @@
+# batch_render.py
+"""Массовая генерация флагов без окна.
+
+Пример:
+    python batch_render.py 100000 out_dir --seed 42
+    python batch_render.py 100000 flags.zip --seed 42 --workers 8
+"""
+import os
+import sys
+import time
+import random
+import zipfile
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+# Рисуем в QImage, дисплей не нужен
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtGui import QGuiApplication
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice
+
+from flag_render import SEED_LIMIT, render_flag
+from palette import generate_palettes
+
+_app = None
+
+
+def _init_worker():
+    global _app
+    if QGuiApplication.instance() is None:
+        _app = QGuiApplication([])
+
+
+def flag_params(base_seed, index, min_stripes, max_stripes):
+    """Seed и число полос флага номер index, зависят только от base_seed"""
+    rng = random.Random(f"{base_seed}:{index}")
+    seed = rng.randrange(SEED_LIMIT)
+    num_stripes = rng.randint(min_stripes, max_stripes)
+    return seed, num_stripes
+
+
+def flag_name(index, seed, num_stripes):
+    return f"flag_{index:07d}_{seed}_{num_stripes}.png"
+
+
+def encode_png(image):
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, "PNG")
+    buffer.close()
+    return bytes(data)
+
+
+def render_batch(task):
+    """Рисует пачку флагов; пишет PNG в out_dir или возвращает их байты"""
+    start, stop, base_seed, min_stripes, max_stripes, width, height, out_dir = task
+
+    params = [
+        flag_params(base_seed, index, min_stripes, max_stripes)
+        for index in range(start, stop)
+    ]
+    # Палитры всей пачки одним векторным вызовом; первые полосы палитры
+    # не зависят от их количества, поэтому берём префикс
+    palettes = generate_palettes([seed for seed, _ in params], max_stripes).tolist()
+
+    results = []
+    total_bytes = 0
+    for index, (seed, num_stripes), palette in zip(range(start, stop), params, palettes):
+        image = render_flag(palette[:num_stripes], width, height)
+        png = encode_png(image)
+        total_bytes += len(png)
+
+        name = flag_name(index, seed, num_stripes)
+        if out_dir is None:
+            results.append((name, png))
+        else:
+            with open(os.path.join(out_dir, name), 'wb') as f:
+                f.write(png)
+
+    return results, stop - start, total_bytes
+
+
+def iter_tasks(args, out_dir):
+    for start in range(0, args.count, args.batch):
+        stop = min(start + args.batch, args.count)
+        yield (start, stop, args.seed, args.min_stripes, args.max_stripes,
+               args.width, args.height, out_dir)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Массовая генерация полосатых флагов")
+    parser.add_argument("count", type=int, help="количество флагов")
+    parser.add_argument("output", help="папка для PNG или архив .zip")
+    parser.add_argument("--seed", type=int, default=0, help="базовый seed")
+    parser.add_argument("--width", type=int, default=400)
+    parser.add_argument("--height", type=int, default=300)
+    parser.add_argument("--min-stripes", type=int, default=2)
+    parser.add_argument("--max-stripes", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--batch", type=int, default=256, help="флагов на задачу")
+    args = parser.parse_args(argv)
+
+    if not 2 <= args.min_stripes <= args.max_stripes:
+        parser.error("Неверный диапазон количества полос")
+
+    output = Path(args.output)
+    archive = None
+    out_dir = None
+    if output.suffix.lower() == ".zip":
+        # PNG уже сжаты, поэтому храним без повторного сжатия
+        archive = zipfile.ZipFile(output, 'w', zipfile.ZIP_STORED, allowZip64=True)
+    else:
+        output.mkdir(parents=True, exist_ok=True)
+        out_dir = str(output)
+
+    started = time.perf_counter()
+    done = 0
+    total_bytes = 0
+
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker) as pool:
+        for results, count, batch_bytes in pool.map(render_batch, iter_tasks(args, out_dir)):
+            for name, png in results:
+                archive.writestr(name, png)
+            done += count
+            total_bytes += batch_bytes
+
+            elapsed = time.perf_counter() - started
+            print(f"\r{done}/{args.count} флагов, {done / elapsed:.0f} флагов/с",
+                  end="", file=sys.stderr)
+
+    if archive is not None:
+        archive.close()
+
+    elapsed = time.perf_counter() - started
+    print(file=sys.stderr)
+    print(f"Готово: {args.count} флагов за {elapsed:.2f} с")
+    print(f"Скорость: {args.count / elapsed:.0f} флагов/с, "
+          f"{total_bytes / elapsed / 2**20:.1f} МБ/с")
+    print(f"Объём PNG: {total_bytes / 2**20:.1f} МБ, процессов: {args.workers}")
+
+
+if __name__ == '__main__':
+    main()
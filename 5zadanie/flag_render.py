@@ -0,0 +1,152 @@
+# flag_render.py
+import hashlib
+from collections import OrderedDict
+from pathlib import Path
+from PyQt5.QtGui import QImage, QPainter, QColor
+from PyQt5.QtCore import Qt
+
+from palette import palette_colors
+
+# seed флага - целое 0 <= seed < SEED_LIMIT: столько помещается в QInputDialog.getInt
+SEED_LIMIT = 2**31
+
+# Версия растров в кэше: увеличивается, когда меняется то, как флаг рисуется,
+# чтобы PNG из FLAG_CACHE_DIR от прежней версии не считались попаданием.
+# Входит только в имя файла: кэш в памяти живёт в пределах одной версии
+CACHE_VERSION = 2
+
+
+def flag_colors(seed, num_stripes):
+    """Возвращает различимые цвета полос (r, g, b), полностью определяемые seed"""
+    return palette_colors(seed, num_stripes)
+
+
+class FlagSpec:
+    """Векторное описание флага: цвета полос и их доли по высоте"""
+
+    def __init__(self, colors, proportions=None, seed=None):
+        self.colors = list(colors)
+        if proportions is None:
+            proportions = [1.0] * len(self.colors)
+        total = float(sum(proportions))
+        self.proportions = [p / total for p in proportions]
+        self.seed = seed
+
+    @classmethod
+    def from_seed(cls, seed, num_stripes):
+        return cls(flag_colors(seed, num_stripes), seed=seed)
+
+    @property
+    def num_stripes(self):
+        return len(self.colors)
+
+    def content_key(self):
+        """Цвета и доли полос: два описания с одинаковым ключом рисуются одинаково"""
+        return (tuple(tuple(int(c) for c in color) for color in self.colors),
+                tuple(self.proportions))
+
+    def digest(self):
+        """Короткий хэш содержимого для имени файла"""
+        return hashlib.sha1(repr(self.content_key()).encode('ascii')).hexdigest()[:16]
+
+    def stripe_bounds(self, height):
+        """Границы полос [(y0, y1), ...] для высоты height"""
+        bounds = []
+        top = 0.0
+        for share in self.proportions:
+            bounds.append((top, top + share * height))
+            top += share * height
+        return bounds
+
+    def rasterize(self, width, height):
+        """Рисует флаг сразу в QImage нужного размера, без масштабирования"""
+        image = QImage(width, height, QImage.Format_RGB32)
+        image.fill(Qt.white)
+        painter = QPainter(image)
+
+        for (r, g, b), (y0, y1) in zip(self.colors, self.stripe_bounds(height)):
+            # Границы округляем от краёв, чтобы полосы не оставляли щелей
+            top = int(round(y0))
+            bottom = int(round(y1))
+            painter.fillRect(0, top, width, bottom - top, QColor(r, g, b))
+
+        painter.end()
+        return image
+
+    def to_svg(self, width=400, height=300):
+        """Возвращает флаг в формате SVG"""
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+            f'viewBox="0 0 {width} {height}" shape-rendering="crispEdges">',
+        ]
+        for (r, g, b), (y0, y1) in zip(self.colors, self.stripe_bounds(height)):
+            lines.append(
+                f'  <rect x="0" y="{y0:.4g}" width="{width}" height="{y1 - y0:.4g}" '
+                f'fill="#{r:02x}{g:02x}{b:02x}"/>'
+            )
+        lines.append('</svg>')
+        return '\n'.join(lines) + '\n'
+
+
+def render_flag(colors, width, height):
+    """Рисует полосатый флаг с равными полосами в QImage заданного размера"""
+    return FlagSpec(colors).rasterize(width, height)
+
+
+class FlagCache:
+    """LRU-кэш отрисованных флагов с ключом (содержимое FlagSpec, width, height).
+
+    Ключ строится по цветам и долям полос, а не по seed: описания без seed
+    или с другими долями не получают чужой растр.
+    """
+
+    def __init__(self, max_items=32, cache_dir=None):
+        self.max_items = max_items
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.images = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _disk_path(self, spec, width, height):
+        return self.cache_dir / f"flag_v{CACHE_VERSION}_{spec.digest()}_{width}x{height}.png"
+
+    def get(self, spec, width, height):
+        """Возвращает растр флага из кэша или рисует его и запоминает"""
+        key = (spec.content_key(), width, height)
+
+        image = self.images.get(key)
+        if image is not None:
+            self.images.move_to_end(key)
+            self.hits += 1
+            return image
+
+        if self.cache_dir is not None:
+            path = self._disk_path(spec, width, height)
+            if path.exists():
+                image = QImage(str(path))
+                if not image.isNull():
+                    self.hits += 1
+                    self._remember(key, image)
+                    return image
+
+        self.misses += 1
+        image = spec.rasterize(width, height)
+        self._remember(key, image)
+
+        if self.cache_dir is not None:
+            image.save(str(self._disk_path(spec, width, height)), "PNG")
+
+        return image
+
+    def _remember(self, key, image):
+        self.images[key] = image
+        self.images.move_to_end(key)
+        while len(self.images) > self.max_items:
+            self.images.popitem(last=False)
+
+    def clear(self):
+        self.images.clear()
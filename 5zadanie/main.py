@@ -1,93 +1,139 @@
 # main.py
+import os
 import sys
 import random
 from pathlib import Path
-from PyQt5.QtWidgets import QApplication, QMainWindow, QInputDialog
-from PyQt5.QtGui import QPixmap, QPainter, QColor
-from PyQt5.QtCore import Qt
-from PyQt5.uic import loadUi
+from PyQt5.QtWidgets import QApplication, QMainWindow, QInputDialog, QFileDialog, QMessageBox
+from PyQt5.QtGui import QPixmap
 
+from generator_flaga_ui import Ui_MainWindow
 
-class FlagGenerator(QMainWindow):
-    def __init__(self):
+from flag_render import SEED_LIMIT, FlagCache, FlagSpec
+
+
+class FlagGenerator(QMainWindow, Ui_MainWindow):
+    def __init__(self, cache_dir=None):
         super().__init__()
 
-        ui_file = Path(__file__).parent / "generator_flaga.ui"
-        if not ui_file.exists():
-            raise FileNotFoundError(f"Не найден файл: {ui_file}")
-        loadUi(str(ui_file), self)
+        self.setupUi(self)
 
         self.btn_generate.clicked.connect(self.generate_flag)
 
-        self.flag_pixmap = None
+        flag_menu = self.menubar.addMenu("Флаг")
+        flag_menu.addAction("Флаг по seed...", self.generate_from_seed)
+        flag_menu.addAction("Сохранить SVG...", self.export_svg)
+
+        # Флаг хранится как векторное описание и растрируется под размер окна
+        self.flag_cache = FlagCache(max_items=32, cache_dir=cache_dir)
+        self.flag_spec = None
         self.status_label.setText("Нажмите 'Сгенерировать'")
 
     def generate_flag(self):
-        """Запрашивает количество полос и рисует флаг"""
+        """Запрашивает количество полос и рисует флаг со случайным seed"""
+        num_stripes = self.ask_num_stripes()
+        if num_stripes is None:
+            return
+
+        self.show_flag(random.randrange(SEED_LIMIT), num_stripes)
+
+    def generate_from_seed(self):
+        """Повторяет флаг по известному seed"""
+        seed, ok = QInputDialog.getInt(
+            self,
+            "Seed",
+            "Введите seed флага:",
+            value=self.flag_spec.seed if self.flag_spec else 0,
+            min=0,
+            max=SEED_LIMIT - 1
+        )
+        if not ok:
+            return
+
+        num_stripes = self.ask_num_stripes()
+        if num_stripes is None:
+            return
+
+        self.show_flag(seed, num_stripes)
+
+    def ask_num_stripes(self):
+        """Запрашивает количество полос, None при отмене"""
         num_stripes, ok = QInputDialog.getInt(
             self,
             "Количество полос",
             "Введите количество цветных полос:",
             min=2,
             max=20,
-            value=5
+            value=self.flag_spec.num_stripes if self.flag_spec else 5
         )
+        return num_stripes if ok else None
 
-        if not ok:
-            return  
+    def show_flag(self, seed, num_stripes):
+        self.flag_spec = FlagSpec.from_seed(seed, num_stripes)
+        self.update_display()
+        # Метка узкая: seed в начале, чтобы его было видно целиком
+        self.status_label.setText(f"seed {seed}, полос: {num_stripes}")
+        self.status_label.setToolTip(f"Флаг с {num_stripes} полосами, seed {seed}")
 
+    def flag_size(self):
         width = self.flag_label.width()
         height = self.flag_label.height()
 
         if width < 10 or height < 10:
             width = 400
             height = 300
-
-        self.flag_pixmap = QPixmap(width, height)
-        self.flag_pixmap.fill(Qt.white)
-        painter = QPainter(self.flag_pixmap)
-
-        stripe_height = height / num_stripes
-
-        # Рисуем полосы
-        for i in range(num_stripes):
-            color = QColor(
-                random.randint(0, 255),
-                random.randint(0, 255),
-                random.randint(0, 255)
-            )
-            y = int(i * stripe_height)
-            h = int(stripe_height)
-            painter.fillRect(0, y, width, h, color)
-
-        painter.end()
-
-        self.update_display()
-        self.status_label.setText(f"Флаг с {num_stripes} полосами сгенерирован.")
+        return width, height
 
     def update_display(self):
-        """Масштабирует и устанавливает pixmap"""
-        if self.flag_pixmap is None:
+        """Растрирует флаг точно под размер метки и устанавливает pixmap"""
+        if self.flag_spec is None:
             self.flag_label.setText("Флаг не сгенерирован")
             return
 
-        scaled = self.flag_pixmap.scaled(
-            self.flag_label.size(),
-            Qt.KeepAspectRatio,
-            Qt.SmoothTransformation
+        width, height = self.flag_size()
+        ratio = self.flag_label.devicePixelRatioF()
+        image = self.flag_cache.get(
+            self.flag_spec,
+            round(width * ratio),
+            round(height * ratio)
         )
-        self.flag_label.setPixmap(scaled)
+        pixmap = QPixmap.fromImage(image)
+        pixmap.setDevicePixelRatio(ratio)
+        self.flag_label.setPixmap(pixmap)
+
+    def export_svg(self):
+        """Сохраняет текущий флаг в SVG"""
+        if self.flag_spec is None:
+            QMessageBox.warning(self, "Предупреждение", "Сначала сгенерируйте флаг.")
+            return
+
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Сохранить SVG",
+            f"flag_{self.flag_spec.seed}.svg",
+            "SVG (*.svg);;Все файлы (*)"
+        )
+        if not file_path:
+            return
+
+        width, height = self.flag_size()
+        try:
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(self.flag_spec.to_svg(width, height))
+            self.status_label.setText(f"Сохранено: {Path(file_path).name}")
+        except OSError as e:
+            QMessageBox.critical(self, "Ошибка", f"Не удалось сохранить файл:\n{str(e)}")
 
     def resizeEvent(self, event):
         """Перерисовывает при изменении размера окна"""
         super().resizeEvent(event)
-        if self.flag_pixmap is not None:
+        if self.flag_spec is not None:
             self.update_display()
 
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
-    window = FlagGenerator()
+    # Дисковый кэш флагов включается переменной окружения
+    window = FlagGenerator(cache_dir=os.environ.get("FLAG_CACHE_DIR"))
     window.setWindowTitle("Генератор полосатого флага")
     window.show()
     sys.exit(app.exec())
\ No newline at end of file
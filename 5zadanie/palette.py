@@ -0,0 +1,117 @@
+# palette.py
+import numpy as np
+
+# Кандидатов на полосу, минимальное расстояние соседних полос в OKLab
+# и сколько предыдущих полос учитывать при выборе
+CANDIDATES = 16
+MIN_DISTANCE = 0.15
+WINDOW = 3
+CHUNK = 4096
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+
+# sRGB (0..255) -> линейный RGB, таблица на 256 значений
+_levels = np.arange(256) / 255.0
+_LINEAR = np.where(
+    _levels <= 0.04045,
+    _levels / 12.92,
+    ((_levels + 0.055) / 1.055) ** 2.4
+).astype(np.float32)
+
+_RGB_TO_LMS = np.array([
+    [0.4122214708, 0.5363325363, 0.0514459929],
+    [0.2119034982, 0.6806995451, 0.1073969566],
+    [0.0883024619, 0.2817188376, 0.6299787005],
+], dtype=np.float32)
+_LMS_TO_LAB = np.array([
+    [0.2104542553, 0.7936177850, -0.0040720468],
+    [1.9779984951, -2.4285922050, 0.4505937099],
+    [0.0259040371, 0.7827717662, -0.8086757660],
+], dtype=np.float32)
+
+
+def _splitmix64(values):
+    """Хэш SplitMix64: одинаковый вход всегда даёт одинаковый выход"""
+    z = values + _GOLDEN
+    z = (z ^ (z >> np.uint64(30))) * _MIX1
+    z = (z ^ (z >> np.uint64(27))) * _MIX2
+    return z ^ (z >> np.uint64(31))
+
+
+def srgb_to_oklab(rgb):
+    """Переводит массив цветов (..., 3) uint8 в перцептивное пространство OKLab"""
+    rgb = np.asarray(rgb)
+    # Двумерное умножение матриц заметно быстрее пакетного (..., 3) @ (3, 3)
+    lms = _LINEAR[rgb.reshape(-1, 3)] @ _RGB_TO_LMS.T
+    return (np.cbrt(lms) @ _LMS_TO_LAB.T).reshape(rgb.shape)
+
+
+def _candidates(seed_keys, stripe, candidates):
+    """Случайные цвета-кандидаты (flags, candidates, 3) для полосы stripe"""
+    counters = np.arange(stripe * candidates, (stripe + 1) * candidates, dtype=np.uint64)
+    bits = _splitmix64(seed_keys[:, None] + counters)
+    # Один хэш даёт 64 бита, берём из него три старших байта
+    rgb = np.empty(bits.shape + (3,), dtype=np.uint8)
+    for channel, shift in enumerate((56, 48, 40)):
+        rgb[..., channel] = (bits >> np.uint64(shift)).astype(np.uint8)
+    return rgb
+
+
+def _generate_chunk(seeds, num_stripes, candidates, min_distance, window):
+    count = len(seeds)
+    rows = np.arange(count)
+
+    seed_keys = _splitmix64(seeds)
+    palette = np.empty((count, num_stripes, 3), dtype=np.uint8)
+    chosen_lab = np.empty((count, num_stripes, 3), dtype=np.float32)
+    for stripe in range(num_stripes):
+        rgb = _candidates(seed_keys, stripe, candidates)
+        lab = srgb_to_oklab(rgb)
+
+        if stripe == 0:
+            best = np.zeros(count, dtype=np.intp)
+        else:
+            # Farthest-point по последним window полосам: далёкие полосы
+            # на флаге рядом не видны, а стоимость остаётся линейной
+            score = None
+            for prev in range(max(0, stripe - window), stripe):
+                diff = lab - chosen_lab[:, prev, None, :]
+                dist = np.einsum('fci,fci->fc', diff, diff)
+                score = dist if score is None else np.minimum(score, dist)
+                if prev == stripe - 1:
+                    too_close = dist < min_distance * min_distance
+            score[too_close] -= 4.0
+            best = score.argmax(axis=1)
+
+        palette[:, stripe] = rgb[rows, best]
+        chosen_lab[:, stripe] = lab[rows, best]
+
+    return palette
+
+
+def generate_palettes(seeds, num_stripes, candidates=CANDIDATES, min_distance=MIN_DISTANCE,
+                      window=WINDOW):
+    """Палитры для многих флагов сразу, массив (len(seeds), num_stripes, 3) uint8.
+
+    Каждая полоса выбирается из кандидатов как самая далёкая в OKLab от
+    window предыдущих (farthest-point), а кандидаты ближе min_distance к
+    соседней полосе отбрасываются. Палитра флага зависит только от его seed, а первые
+    k полос не зависят от num_stripes.
+    """
+    seeds = np.asarray(seeds, dtype=np.uint64).reshape(-1)
+    palette = np.empty((len(seeds), num_stripes, 3), dtype=np.uint8)
+    # Кусками, чтобы матрица расстояний кандидатов помещалась в кэш и память
+    for start in range(0, len(seeds), CHUNK):
+        chunk = seeds[start:start + CHUNK]
+        palette[start:start + len(chunk)] = _generate_chunk(
+            chunk, num_stripes, candidates, min_distance, window
+        )
+    return palette
+
+
+def palette_colors(seed, num_stripes):
+    """Палитра одного флага списком кортежей (r, g, b)"""
+    palette = generate_palettes([seed], num_stripes)[0]
+    return [tuple(int(c) for c in color) for color in palette]
@@ -1,20 +1,18 @@
 # main.py
 import sys
-from pathlib import Path
 from PyQt5.QtWidgets import QApplication, QMainWindow, QColorDialog
-from PyQt5.QtGui import QPainter, QPen, QBrush, QColor, QPixmap
-from PyQt5.QtCore import Qt
-from PyQt5.uic import loadUi
+from PyQt5.QtGui import QColor
 
+from smilik_ui import Ui_MainWindow
 
-class SmileyApp(QMainWindow):
+from smiley_canvas import SmileyCanvas
+
+
+class SmileyApp(QMainWindow, Ui_MainWindow):
     def __init__(self):
         super().__init__()
 
-        ui_file = Path(__file__).parent / "smilik.ui"
-        if not ui_file.exists():
-            raise FileNotFoundError(f"Не найден файл: {ui_file}")
-        loadUi(str(ui_file), self)
+        self.setupUi(self)
 
         self.smiley_color = QColor(255, 220, 0)  
         self.scale_factor = 1.0  
@@ -28,8 +26,17 @@ class SmileyApp(QMainWindow):
 
         self.btn_color.clicked.connect(self.choose_color)
 
-        self.canvas.setAlignment(Qt.AlignCenter)
+        # Вместо QLabel из .ui ставим холст, который рисует сам
+        label = self.canvas
+        self.canvas = SmileyCanvas(label.parentWidget())
+        self.canvas.setGeometry(label.geometry())
         self.canvas.setMinimumSize(300, 300)
+        label.deleteLater()
+
+        # set_color и set_scale только планируют перерисовку, поэтому время
+        # отрисовки попадает в строку состояния, когда холст её закончит
+        self.status_message = "Готово"
+        self.canvas.painted.connect(self.show_paint_stats)
 
         self.draw_smiley()
 
@@ -38,87 +45,32 @@ class SmileyApp(QMainWindow):
         color = QColorDialog.getColor(self.smiley_color, self, "Выберите цвет смайлика")
         if color.isValid():
             self.smiley_color = color
-            self.draw_smiley()
-            self.statusBar().showMessage("Цвет изменён")
+            self.canvas.set_color(color)
+            self.show_status("Цвет изменён")
 
     def update_scale(self, value):
         """Обновляет масштаб"""
         self.scale_factor = value / 100.0
         self.scale_label.setText(f"{value}%")
-        self.draw_smiley()
-        self.statusBar().showMessage(f"Масштаб: {value}%")
-
-    def draw_smiley(self):
-        """Рисует смайлик с текущим цветом и масштабом"""
-        size = self.canvas.size()
-        w, h = size.width(), size.height()
-
-        if w < 10 or h < 10:
-            w = h = 500
-
-        pixmap = QPixmap(w, h)
-        pixmap.fill(Qt.transparent)
-        painter = QPainter(pixmap)
-        painter.setRenderHint(QPainter.Antialiasing)
-
-        center_x = w // 2
-        center_y = h // 2
-        base_radius = min(w, h) * 0.4 * self.scale_factor
-
-        # Лицо
-        painter.setPen(QPen(Qt.black, 2))
-        painter.setBrush(QBrush(self.smiley_color))
-        painter.drawEllipse(
-            int(center_x - base_radius),
-            int(center_y - base_radius),
-            int(2 * base_radius),
-            int(2 * base_radius)
-        )
-
-        # Глаза
-        eye_r = base_radius * 0.15
-        # Левый глаз
-        painter.setBrush(QBrush(Qt.black))
-        painter.drawEllipse(
-            int(center_x - base_radius * 0.4 - eye_r),
-            int(center_y - base_radius * 0.4 - eye_r),
-            int(2 * eye_r),
-            int(2 * eye_r)
+        self.canvas.set_scale(self.scale_factor)
+        self.show_status(f"Масштаб: {value}%")
+
+    def show_status(self, message):
+        """Запоминает сообщение; статистика к нему добавится после отрисовки"""
+        self.status_message = message
+
+    def show_paint_stats(self, paint_ms):
+        """Сообщение вместе со статистикой только что закончившейся отрисовки"""
+        cache = self.canvas.geometry_cache
+        self.statusBar().showMessage(
+            f"{self.status_message} | кэш геометрии: {cache.hit_rate:.0%} попаданий, "
+            f"отрисовка {paint_ms:.1f} мс"
         )
-        # Правый глаз
-        painter.drawEllipse(
-            int(center_x + base_radius * 0.4 - eye_r),
-            int(center_y - base_radius * 0.4 - eye_r),
-            int(2 * eye_r),
-            int(2 * eye_r)
-        )
-
-        # Улыбка
-        smile_r = base_radius * 0.7
-        rect = (
-            int(center_x - smile_r),
-            int(center_y - smile_r * 0.5),
-            int(2 * smile_r),
-            int(2 * smile_r)
-        )
-        painter.setPen(QPen(Qt.black, 3))
-        painter.setBrush(Qt.NoBrush)
-        painter.drawArc(*rect, 0 * 16, 180 * 16)  # нижняя дуга
-
-        painter.end()
 
-        # Масштабирование
-        scaled = pixmap.scaled(
-            self.canvas.size(),
-            Qt.KeepAspectRatio,
-            Qt.SmoothTransformation
-        )
-        self.canvas.setPixmap(scaled)
-
-    def resizeEvent(self, event):
-        """Перерисовка при изменении размера окна"""
-        super().resizeEvent(event)
-        self.draw_smiley()
+    def draw_smiley(self):
+        """Передаёт холсту текущий цвет и масштаб"""
+        self.canvas.set_color(self.smiley_color)
+        self.canvas.set_scale(self.scale_factor)
 
 
 if __name__ == '__main__':
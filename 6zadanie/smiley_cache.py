@@ -0,0 +1,37 @@
+# smiley_cache.py
+from collections import OrderedDict
+
+
+class RenderCache:
+    """LRU-кэш с ограничением по числу записей"""
+
+    def __init__(self, max_items=256):
+        self.max_items = max_items
+        self.items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        item = self.items.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+
+        self.items.move_to_end(key)
+        self.hits += 1
+        return item
+
+    def put(self, key, value):
+        """Запоминает value, вытесняя самые старые записи"""
+        self.items[key] = value
+        self.items.move_to_end(key)
+        while len(self.items) > self.max_items:
+            self.items.popitem(last=False)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self):
+        self.items.clear()
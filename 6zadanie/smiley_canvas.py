@@ -0,0 +1,110 @@
+# smiley_canvas.py
+import time
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtGui import QPainter, QPen, QBrush, QColor
+from PyQt5.QtCore import Qt, QRectF, QPointF, pyqtSignal
+
+from smiley_cache import RenderCache
+
+# Сколько пар (размер, масштаб) держать в кэше геометрии
+GEOMETRY_CACHE_SIZE = 256
+
+
+class SmileyGeometry:
+    """Прямоугольники лица, глаз и улыбки для заданного размера и масштаба"""
+
+    def __init__(self, width, height, scale_factor):
+        center = QPointF(width / 2, height / 2)
+        base_radius = min(width, height) * 0.4 * scale_factor
+
+        self.face = self._circle(center, base_radius)
+
+        eye_r = base_radius * 0.15
+        eye_dx = base_radius * 0.4
+        self.left_eye = self._circle(center + QPointF(-eye_dx, -eye_dx), eye_r)
+        self.right_eye = self._circle(center + QPointF(eye_dx, -eye_dx), eye_r)
+
+        smile_r = base_radius * 0.7
+        self.smile = QRectF(
+            center.x() - smile_r,
+            center.y() - smile_r * 0.5,
+            2 * smile_r,
+            2 * smile_r
+        )
+
+        # Область, которую занимает смайлик вместе с толщиной обводки
+        self.bounds = self.face.adjusted(-2, -2, 2, 2).toAlignedRect()
+
+    @staticmethod
+    def _circle(center, radius):
+        return QRectF(center.x() - radius, center.y() - radius, 2 * radius, 2 * radius)
+
+
+class SmileyCanvas(QWidget):
+    """Холст, рисующий смайлик прямо в paintEvent"""
+
+    # Время только что закончившейся отрисовки, мс
+    painted = pyqtSignal(float)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.smiley_color = QColor(255, 220, 0)
+        self.scale_factor = 1.0
+
+        # Геометрия считается один раз на пару (размер, масштаб)
+        self.geometry_cache = RenderCache(max_items=GEOMETRY_CACHE_SIZE)
+        self.geometry_key = None
+        self.geometry = None
+        self.paint_ms = 0.0
+
+    def smiley_geometry(self):
+        """Геометрия для текущих размера и масштаба.
+
+        В кэш обращаемся только при смене пары (размер, масштаб), поэтому
+        его статистика считает построения, а не перерисовки.
+        """
+        key = (self.width(), self.height(), self.scale_factor)
+        if key != self.geometry_key:
+            geometry = self.geometry_cache.get(key)
+            if geometry is None:
+                geometry = SmileyGeometry(self.width(), self.height(), self.scale_factor)
+                self.geometry_cache.put(key, geometry)
+            self.geometry_key, self.geometry = key, geometry
+        return self.geometry
+
+    def set_color(self, color):
+        self.smiley_color = QColor(color)
+        # Цвет меняет только лицо, остальной холст не трогаем
+        self.update(self.smiley_geometry().bounds)
+
+    def set_scale(self, scale_factor):
+        old_bounds = self.smiley_geometry().bounds
+        self.scale_factor = scale_factor
+        self.update(old_bounds.united(self.smiley_geometry().bounds))
+
+    def paintEvent(self, event):
+        started = time.perf_counter()
+        geometry = self.smiley_geometry()
+
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setClipRect(event.rect())
+
+        # Лицо
+        painter.setPen(QPen(Qt.black, 2))
+        painter.setBrush(QBrush(self.smiley_color))
+        painter.drawEllipse(geometry.face)
+
+        # Глаза
+        painter.setBrush(QBrush(Qt.black))
+        painter.drawEllipse(geometry.left_eye)
+        painter.drawEllipse(geometry.right_eye)
+
+        # Улыбка
+        painter.setPen(QPen(Qt.black, 3))
+        painter.setBrush(Qt.NoBrush)
+        painter.drawArc(geometry.smile, 0 * 16, 180 * 16)  # нижняя дуга
+
+        painter.end()
+        self.paint_ms = (time.perf_counter() - started) * 1000
+        self.painted.emit(self.paint_ms)
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-# Form implementation generated from reading ui file 'd:\work\code\3HomeWork\6zadanie\smilik.ui'
+# Form implementation generated from reading ui file '6zadanie/smilik.ui'
 #
 # Created by: PyQt5 UI code generator 5.15.11
 #
@@ -52,3 +52,15 @@ class Ui_MainWindow(object):
         self.btn_color.setText(_translate("MainWindow", "Color"))
         self.scale_label.setText(_translate("MainWindow", "Percent"))
         self.label.setText(_translate("MainWindow", "Scale"))
+
+
+# Дописано build_ui.py: .ui правили после генерации, а модуль не пересобрали
+import sys as _sys
+from pathlib import Path as _Path
+
+_ui_file = _Path(__file__).with_name('smilik.ui')
+if _ui_file.exists() and _ui_file.stat().st_mtime > _Path(__file__).stat().st_mtime:
+    from PyQt5 import uic as _uic
+    print(f"{_ui_file.name} новее {_Path(__file__).name}, интерфейс собран из .ui; "
+          "обновите модули: python build_ui.py", file=_sys.stderr)
+    Ui_MainWindow, _ = _uic.loadUiType(str(_ui_file))
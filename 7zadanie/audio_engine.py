@@ -0,0 +1,149 @@
+# audio_engine.py
+import time
+import threading
+import numpy as np
+from PyQt5.QtCore import QObject, QIODevice, pyqtSignal
+from PyQt5.QtMultimedia import QAudioOutput
+
+from sample_bank import pcm_format
+from pcm import SAMPLE_RATE, to_int16
+
+# Размер буфера звуковой карты: меньше буфер - меньше задержка
+BUFFER_FRAMES = 1024
+BYTES_PER_FRAME = 2
+
+# Число голосов полифонии и длительность затухания после отпускания клавиши
+VOICES = 16
+RELEASE_FRAMES = int(0.08 * SAMPLE_RATE)
+
+
+class Voice:
+    """Голос пула: сэмпл звучащей ноты и позиция в нём"""
+
+    def __init__(self):
+        self.note = None
+        self.samples = None
+        self.position = 0
+        self.pressed_at = 0.0
+        self.gain = 1.0
+        self.started = 0
+        self.active = False
+        self.release_left = None
+
+    def start(self, note, samples, pressed_at, gain, started):
+        self.note = note
+        self.samples = samples
+        self.position = 0
+        self.pressed_at = pressed_at
+        self.gain = gain
+        self.started = started
+        self.active = True
+        self.release_left = None
+
+
+class MixerDevice(QIODevice):
+    """Источник PCM для QAudioOutput: смешивает все звучащие голоса"""
+
+    def __init__(self, engine, voices=VOICES):
+        super().__init__(engine)
+        self.engine = engine
+        self.lock = threading.Lock()
+        # Пул голосов фиксированный, во время игры ничего не создаётся
+        self.voices = [Voice() for _ in range(voices)]
+        self.counter = 0
+        self.mix = np.zeros(BUFFER_FRAMES, dtype=np.float32)
+
+    def start_voice(self, note, samples, pressed_at, gain=1.0):
+        with self.lock:
+            voice = next((v for v in self.voices if not v.active), None)
+            if voice is None:
+                # Пул занят: забираем самый старый голос
+                voice = min(self.voices, key=lambda v: v.started)
+            self.counter += 1
+            voice.start(note, samples, pressed_at, gain, self.counter)
+
+    def release_voice(self, note):
+        """Начинает затухание всех голосов ноты"""
+        with self.lock:
+            for voice in self.voices:
+                if voice.active and voice.note == note and voice.release_left is None:
+                    voice.release_left = RELEASE_FRAMES
+
+    def active_voices(self):
+        return sum(voice.active for voice in self.voices)
+
+    def readData(self, maxlen):
+        frames = maxlen // BYTES_PER_FRAME
+        if len(self.mix) < frames:
+            self.mix = np.zeros(frames, dtype=np.float32)
+        out = self.mix[:frames]
+        out.fill(0.0)
+
+        with self.lock:
+            for voice in self.voices:
+                if not voice.active:
+                    continue
+
+                chunk = voice.samples[voice.position:voice.position + frames]
+                if voice.release_left is not None:
+                    # Линейное затухание после отпускания клавиши
+                    chunk = chunk[:voice.release_left]
+                    ramp = (voice.release_left - np.arange(len(chunk))) / RELEASE_FRAMES
+                    out[:len(chunk)] += chunk * ramp * voice.gain
+                    voice.release_left -= len(chunk)
+                    if voice.release_left <= 0:
+                        voice.active = False
+                else:
+                    out[:len(chunk)] += chunk * voice.gain
+
+                if voice.position == 0 and voice.pressed_at is not None:
+                    latency = time.perf_counter() - voice.pressed_at
+                    self.engine.latency_measured.emit(voice.note, latency * 1000)
+
+                voice.position += len(chunk)
+                if voice.position >= len(voice.samples):
+                    voice.active = False
+
+        return to_int16(out).tobytes()
+
+    def writeData(self, data):
+        return 0
+
+    def bytesAvailable(self):
+        # Поток бесконечный: пока нот нет, отдаём тишину
+        return BUFFER_FRAMES * BYTES_PER_FRAME + super().bytesAvailable()
+
+    def isSequential(self):
+        return True
+
+
+class AudioEngine(QObject):
+    """Полифонический вывод нот из памяти через QAudioOutput с маленьким буфером"""
+
+    # нота, задержка от нажатия до первого буфера с нотой в мс
+    latency_measured = pyqtSignal(str, float)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.device = MixerDevice(self)
+        self.device.open(QIODevice.ReadOnly)
+
+        self.output = QAudioOutput(pcm_format(), self)
+        self.output.setBufferSize(BUFFER_FRAMES * BYTES_PER_FRAME)
+        # Вывод запущен всё время, поэтому нота не ждёт открытия устройства
+        self.output.start(self.device)
+
+    @property
+    def buffer_ms(self):
+        return self.output.bufferSize() / BYTES_PER_FRAME / SAMPLE_RATE * 1000
+
+    def play(self, note, samples, pressed_at=None, gain=1.0):
+        """Запускает ноту; если задан pressed_at, измеряется задержка до звука"""
+        self.device.start_voice(note, samples, pressed_at, gain)
+
+    def release(self, note):
+        self.device.release_voice(note)
+
+    def stop(self):
+        self.output.stop()
+        self.device.close()
@@ -0,0 +1,49 @@
+# build_samples.py
+"""Собирает sounds/bank.npz: все полутона из ближайших исходных MP3.
+
+Запуск: python build_samples.py
+"""
+import sys
+import time
+from pathlib import Path
+from PyQt5.QtCore import QCoreApplication
+
+from sample_bank import SampleBank
+from pcm import BANK_FILE, save_bank, source_notes, source_signature
+from pitch_shift import build_bank, parse_note
+
+# Диапазон банка: с запасом вокруг исходных сэмплов
+BANK_LOW = parse_note('C3')
+BANK_HIGH = parse_note('B6')
+
+
+def main():
+    app = QCoreApplication(sys.argv)
+    sound_dir = Path(__file__).parent / "sounds"
+    notes = source_notes(sound_dir)
+    if not notes:
+        print(f"В {sound_dir} нет MP3-файлов")
+        return 1
+
+    started = time.perf_counter()
+    decoder = SampleBank(sound_dir, notes)
+    decoder.progress.connect(lambda done, total: print(f"Декодировано {done}/{total}"))
+    decoder.finished.connect(app.quit)
+    decoder.decode_sources()
+    if not decoder.is_loaded():
+        app.exec()
+    decoded = time.perf_counter()
+
+    bank = build_bank(decoder.samples, BANK_LOW, BANK_HIGH)
+    shifted = time.perf_counter()
+
+    path = sound_dir / BANK_FILE
+    save_bank(path, bank, source_signature(sound_dir, notes))
+
+    print(f"Декодирование: {decoded - started:.1f} с, сдвиг высоты: {shifted - decoded:.1f} с")
+    print(f"Сохранено {len(bank)} нот в {path} ({path.stat().st_size / 2**20:.1f} МБ)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,50 @@
+# latency_overlay.py
+import math
+from bisect import insort
+from PyQt5.QtWidgets import QLabel
+from PyQt5.QtCore import Qt
+
+
+def percentile(values, share):
+    """Перцентиль по отсортированному списку (ближайший ранг)"""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(share * len(values)) - 1)]
+
+
+class LatencyOverlay(QLabel):
+    """Полупрозрачная панель поверх окна с p50/p99 задержки за сессию"""
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.latencies = []
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setStyleSheet(
+            "background-color: rgba(0, 0, 0, 160); color: white; padding: 4px;"
+        )
+        self.refresh()
+
+    def add(self, latency_ms):
+        # Список всегда отсортирован, перцентили берутся по индексу
+        insort(self.latencies, latency_ms)
+        self.refresh()
+
+    def reset(self):
+        self.latencies = []
+        self.refresh()
+
+    def refresh(self):
+        if not self.latencies:
+            self.setText("Задержка: нет данных")
+        else:
+            self.setText(
+                f"Нажатие → буфер: p50 {percentile(self.latencies, 0.5):.1f} мс, "
+                f"p99 {percentile(self.latencies, 0.99):.1f} мс ({len(self.latencies)})"
+            )
+        self.adjustSize()
+        self.reposition()
+
+    def reposition(self):
+        parent = self.parentWidget()
+        self.move(parent.width() - self.width() - 8, 30)
+        self.raise_()
@@ -1,39 +1,53 @@
 # main.py
 import sys
+import time
+import struct
 from pathlib import Path
-from PyQt5.QtWidgets import QApplication, QMainWindow, QPushButton, QMessageBox
-from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
-from PyQt5.QtCore import QUrl
-from PyQt5.uic import loadUi
+from PyQt5.QtWidgets import QApplication, QMainWindow, QPushButton, QMessageBox, QFileDialog
+from PyQt5.QtCore import Qt, pyqtSignal
 
+from piano_ui import Ui_MainWindow
+
+from sample_bank import SampleBank
+from pcm import source_notes
+from audio_engine import AudioEngine
+from pitch_shift import NOTE_NAMES, note_name, parse_note
+from midi_sequencer import MidiSequencer, read_header
+from latency_overlay import LatencyOverlay
+
+KEYBOARD_OCTAVE = 4
+
+# Клавиши компьютера -> клавиши фортепиано (нижний ряд белые, верхний чёрные)
+KEYBOARD_KEYS = {
+    Qt.Key_A: 'C', Qt.Key_W: 'C#', Qt.Key_S: 'D', Qt.Key_E: 'D#',
+    Qt.Key_D: 'E', Qt.Key_F: 'F', Qt.Key_T: 'F#', Qt.Key_G: 'G',
+    Qt.Key_Y: 'G#', Qt.Key_H: 'A', Qt.Key_U: 'A#', Qt.Key_J: 'B',
+}
+
+
+class PianoApp(QMainWindow, Ui_MainWindow):
+    # Сигналы из потока секвенсора в поток интерфейса
+    midi_note_on = pyqtSignal(int)
+    midi_note_off = pyqtSignal(int)
+    midi_finished = pyqtSignal(str)
 
-class PianoApp(QMainWindow):
     def __init__(self):
         super().__init__()
 
-        ui_file = Path(__file__).parent / "piano.ui"
-        if not ui_file.exists():
-            raise FileNotFoundError(f"Не найден файл интерфейса: {ui_file.resolve()}")
-        loadUi(str(ui_file), self)
+        self.setupUi(self)
 
         self.sound_dir = Path(__file__).parent / "sounds"
 
         if not self.sound_dir.exists():
             QMessageBox.warning(self, "Предупреждение", f"Папка 'sounds' не найдена. Фортепиано будет работать без звука.")
 
-        self.notes = {
-            'A3#': 'A3#.mp3',
-            'A5': 'A5.mp3',
-            'B3': 'B3.mp3',
-            'B3#': 'B3#.mp3',
-            'C4': 'C4.mp3',
-            'C4#': 'C4#.mp3',
-            'D4': 'D4.mp3',
-            'D6': 'D6.mp3',
-            'E3': 'E3.mp3',
-            'F6': 'F6.mp3',
-            'G4': 'G4.mp3',
-            'G5': 'G5.mp3'
+        # Исходные сэмплы; недостающие полутона собирает build_samples.py
+        self.notes = source_notes(self.sound_dir)
+
+        # Клавиша -> нота: клавиатура играет четвёртую октаву
+        self.key_notes = {
+            key: note_name(parse_note(f"{key[0]}{KEYBOARD_OCTAVE}{key[1:]}"))
+            for key in NOTE_NAMES
         }
 
         # Белые клавиши (objectName из Qt Designer)
@@ -51,12 +65,31 @@ class PianoApp(QMainWindow):
         self.black_keys = {}
         self.create_black_keys()
 
-        # Медиаплеер
-        self.player = QMediaPlayer()
+        # Все звуки декодируются один раз в фоне и играются из памяти
+        self.audio = AudioEngine(self)
+        self.audio.latency_measured.connect(self.show_latency)
+
+        # Задержка от события ввода до первого буфера с нотой за сессию
+        self.latency_overlay = LatencyOverlay(self)
+
+        self.sample_bank = SampleBank(self.sound_dir, self.notes, self)
+        self.sample_bank.progress.connect(self.show_load_progress)
+        self.sample_bank.finished.connect(self.show_bank_ready)
 
         self.setup_key_connections()
 
-        self.status_label.setText("Фортепиано готово")
+        # Воспроизведение MIDI-файлов
+        self.sequencer = None
+        self.highlighted = {}
+        midi_menu = self.menubar.addMenu("MIDI")
+        midi_menu.addAction("Открыть MIDI...", self.open_midi)
+        midi_menu.addAction("Остановить", self.stop_midi)
+        self.midi_note_on.connect(lambda note: self.highlight_key(note, True))
+        self.midi_note_off.connect(lambda note: self.highlight_key(note, False))
+        self.midi_finished.connect(self.status_label.setText)
+
+        self.status_label.setText("Загрузка звуков...")
+        self.sample_bank.load()
 
     def create_black_keys(self):
         """Создаёт чёрные клавиши поверх белых"""
@@ -79,6 +112,7 @@ class PianoApp(QMainWindow):
         """Переопределено: при изменении размера окна перерисовываем позиции чёрных клавиш"""
         super().resizeEvent(event)
         self.reposition_black_keys()
+        self.latency_overlay.reposition()
 
     def reposition_black_keys(self):
         """Располагает чёрные клавиши над белыми"""
@@ -112,29 +146,133 @@ class PianoApp(QMainWindow):
 
     def setup_key_connections(self):
         """Назначает обработчики нажатий для всех клавиш"""
-        # Белые клавиши
-        for note, button in self.white_keys.items():
-            button.clicked.connect(lambda _, n=note: self.play_note(n))
-
-        # Чёрные клавиши
-        for note, button in self.black_keys.items():
-            button.clicked.connect(lambda _, n=note: self.play_note(n))
-
-    def play_note(self, note):
-        """Проигрывает звук ноты"""
-        filename = self.notes.get(note)
-        if not filename:
+        # Нота звучит по нажатию кнопки мыши, а не по отпусканию (clicked)
+        for note, button in list(self.white_keys.items()) + list(self.black_keys.items()):
+            button.pressed.connect(lambda n=note: self.play_note(n))
+            button.released.connect(lambda n=note: self.release_note(n))
+            # Фокус остаётся у окна, чтобы клавиатура всегда попадала в keyPressEvent
+            button.setFocusPolicy(Qt.NoFocus)
+
+    def keyPressEvent(self, event):
+        pressed_at = time.perf_counter()
+        key = KEYBOARD_KEYS.get(event.key())
+        if key is None:
+            super().keyPressEvent(event)
+            return
+        # Автоповтор зажатой клавиши не перезапускает ноту
+        if not event.isAutoRepeat():
+            self.play_note(key, pressed_at)
+            self.highlight_key(parse_note(self.key_notes[key]), True)
+
+    def keyReleaseEvent(self, event):
+        key = KEYBOARD_KEYS.get(event.key())
+        if key is None:
+            super().keyReleaseEvent(event)
             return
+        if not event.isAutoRepeat():
+            self.release_note(key)
+            self.highlight_key(parse_note(self.key_notes[key]), False)
 
-        file_path = self.sound_dir / filename
-        if file_path.exists():
-            url = QUrl.fromLocalFile(str(file_path))
-            self.player.setMedia(QMediaContent(url))
-            self.player.play()
+    def release_note(self, key):
+        note = self.key_notes.get(key)
+        if note:
+            self.audio.release(note)
+
+    def play_note(self, key, pressed_at=None):
+        """Проигрывает звук клавиши из заранее подготовленных сэмплов"""
+        if pressed_at is None:
+            pressed_at = time.perf_counter()
+        note = self.key_notes.get(key)
+        if not note:
+            return
+
+        samples = self.sample_bank.samples.get(note)
+        if samples is not None:
+            self.audio.play(note, samples, pressed_at)
             self.status_label.setText(f"Играет: {note}")
+        elif not self.sample_bank.is_loaded():
+            self.status_label.setText(f"Звук ещё загружается: {note}")
         else:
-            self.status_label.setText(f"Звук не найден: {filename}")
-            print(f"Файл не найден: {file_path}")
+            self.status_label.setText(f"Нет сэмпла {note}, запустите build_samples.py")
+
+    def show_load_progress(self, loaded, total):
+        self.status_label.setText(f"Загрузка звуков: {loaded}/{total}")
+
+    def show_bank_ready(self):
+        missing = [note for note in self.key_notes.values() if note not in self.sample_bank.samples]
+        if missing:
+            self.status_label.setText(f"Нет сэмплов: {len(missing)}, запустите build_samples.py")
+        else:
+            self.status_label.setText("Фортепиано готово")
+
+    def show_latency(self, note, latency_ms):
+        """Показывает задержку от нажатия до звука"""
+        self.latency_overlay.add(latency_ms)
+        self.status_label.setText(
+            f"Играет: {note}, голосов: {self.audio.device.active_voices()}\n"
+            f"задержка {latency_ms:.1f} мс + буфер {self.audio.buffer_ms:.0f} мс"
+        )
+
+    def open_midi(self):
+        """Открывает MIDI-файл и запускает его воспроизведение"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Открыть MIDI-файл",
+            "",
+            "MIDI (*.mid *.midi);;Все файлы (*)"
+        )
+        if not file_path:
+            return
+
+        try:
+            read_header(file_path)
+        except (OSError, ValueError, struct.error) as e:
+            QMessageBox.critical(self, "Ошибка", f"Не удалось открыть MIDI-файл:\n{str(e)}")
+            return
+
+        self.stop_midi()
+        self.sequencer = MidiSequencer(
+            file_path,
+            self.play_midi_note,
+            self.release_midi_note,
+            lambda stats: self.midi_finished.emit(f"MIDI: {stats.summary()}")
+        )
+        self.sequencer.start()
+        self.status_label.setText(f"MIDI: {Path(file_path).name}")
+
+    def stop_midi(self):
+        if self.sequencer is not None:
+            self.sequencer.stop()
+            self.sequencer.join()
+            self.sequencer = None
+
+    def play_midi_note(self, midi, velocity):
+        """Вызывается из потока секвенсора: звук сразу, подсветка через сигнал"""
+        samples = self.sample_bank.samples.get(note_name(midi))
+        if samples is not None:
+            self.audio.play(note_name(midi), samples, gain=velocity / 127)
+        self.midi_note_on.emit(midi)
+
+    def release_midi_note(self, midi):
+        """Вызывается из потока секвенсора при выключении ноты"""
+        self.audio.release(note_name(midi))
+        self.midi_note_off.emit(midi)
+
+    def highlight_key(self, midi, pressed):
+        """Подсвечивает клавишу той же ноты (в любой октаве)"""
+        key = NOTE_NAMES[midi % 12]
+        button = self.white_keys.get(key) or self.black_keys.get(key)
+        if button is None:
+            return
+
+        count = self.highlighted.get(key, 0) + (1 if pressed else -1)
+        self.highlighted[key] = max(count, 0)
+        button.setDown(self.highlighted[key] > 0)
+
+    def closeEvent(self, event):
+        self.stop_midi()
+        self.audio.stop()
+        super().closeEvent(event)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,272 @@
+# midi_sequencer.py
+import os
+import sys
+import heapq
+import struct
+import threading
+import time
+
+# Типы событий; при одинаковом времени выключение ноты идёт раньше включения
+TEMPO, NOTE_OFF, NOTE_ON = 0, 1, 2
+
+DEFAULT_TEMPO = 500000  # мкс на четверть, 120 BPM
+READ_BLOCK = 64 * 1024
+
+# Спин-ожидание последних миллисекунд перед событием
+SPIN_SECONDS = 0.002
+JITTER_BIN_US = 50
+JITTER_BINS = 2000  # гистограмма до 100 мс
+
+
+class MidiError(ValueError):
+    pass
+
+
+class _TrackReader:
+    """Читает байты дорожки блоками, не загружая файл целиком"""
+
+    def __init__(self, path, offset, length):
+        self.file = open(path, 'rb')
+        self.file.seek(offset)
+        self.remaining = length
+        self.block = b''
+        self.pos = 0
+
+    def byte(self):
+        if self.pos >= len(self.block):
+            if self.remaining <= 0:
+                raise EOFError
+            self.block = self.file.read(min(READ_BLOCK, self.remaining))
+            if not self.block:
+                raise EOFError
+            self.remaining -= len(self.block)
+            self.pos = 0
+        value = self.block[self.pos]
+        self.pos += 1
+        return value
+
+    def read(self, count):
+        return bytes(self.byte() for _ in range(count))
+
+    def varlen(self):
+        value = 0
+        while True:
+            b = self.byte()
+            value = (value << 7) | (b & 0x7F)
+            if not b & 0x80:
+                return value
+
+    def close(self):
+        self.file.close()
+
+
+def read_header(path):
+    """Формат, смещения дорожек [(offset, length)] и division файла"""
+    tracks = []
+    with open(path, 'rb') as f:
+        chunk, length = struct.unpack('>4sI', f.read(8))
+        if chunk != b'MThd':
+            raise MidiError("Это не MIDI-файл")
+        midi_format, count, division = struct.unpack('>HHH', f.read(6))
+        f.seek(length - 6, os.SEEK_CUR)
+
+        while len(tracks) < count:
+            header = f.read(8)
+            if len(header) < 8:
+                break
+            chunk, length = struct.unpack('>4sI', header)
+            if chunk == b'MTrk':
+                tracks.append((f.tell(), length))
+            f.seek(length, os.SEEK_CUR)
+
+    return midi_format, tracks, division
+
+
+def iter_track(path, offset, length, track_index):
+    """Генератор событий дорожки: (tick, тип, номер дорожки, данные)"""
+    reader = _TrackReader(path, offset, length)
+    tick = 0
+    status = 0
+    try:
+        while True:
+            tick += reader.varlen()
+            b = reader.byte()
+
+            if b == 0xFF:
+                meta_type = reader.byte()
+                data = reader.read(reader.varlen())
+                if meta_type == 0x51 and len(data) == 3:
+                    yield tick, TEMPO, track_index, int.from_bytes(data, 'big')
+                elif meta_type == 0x2F:
+                    return
+                continue
+            if b in (0xF0, 0xF7):
+                reader.read(reader.varlen())
+                continue
+
+            if b & 0x80:
+                status = b
+                first = None
+            else:
+                # running status: байт уже относится к данным
+                first = b
+
+            kind = status & 0xF0
+            channel = status & 0x0F
+            data1 = first if first is not None else reader.byte()
+            if kind in (0xC0, 0xD0):
+                continue
+            data2 = reader.byte()
+
+            if kind == 0x90 and data2 > 0:
+                yield tick, NOTE_ON, track_index, (channel, data1, data2)
+            elif kind == 0x80 or kind == 0x90:
+                yield tick, NOTE_OFF, track_index, (channel, data1, 0)
+    except EOFError:
+        return
+    finally:
+        reader.close()
+
+
+def iter_events(path):
+    """События всего файла по порядку со временем в секундах.
+
+    Дорожки читаются параллельно и сливаются по тику, поэтому в памяти
+    держится по одному событию на дорожку. Время считается целочисленно:
+    сумма (тики * темп) делится на division только при выдаче события,
+    так что смены темпа не накапливают ошибку округления.
+    """
+    _, tracks, division = read_header(path)
+    streams = [
+        iter_track(path, offset, length, index)
+        for index, (offset, length) in enumerate(tracks)
+    ]
+    merged = heapq.merge(*streams, key=lambda event: (event[0], event[1], event[2]))
+
+    if division & 0x8000:
+        # SMPTE: кадров в секунду * тиков в кадре, темп не влияет
+        fps = 256 - (division >> 8)
+        ticks_per_second = fps * (division & 0xFF)
+        for tick, kind, _, data in merged:
+            if kind != TEMPO:
+                yield tick / ticks_per_second, kind, data
+        return
+
+    tempo = DEFAULT_TEMPO
+    last_tick = 0
+    elapsed = 0  # мкс * division
+    for tick, kind, _, data in merged:
+        elapsed += (tick - last_tick) * tempo
+        last_tick = tick
+        if kind == TEMPO:
+            tempo = data
+        else:
+            yield elapsed / (division * 1_000_000), kind, data
+
+
+class JitterStats:
+    """Опоздания событий относительно расписания, гистограммой"""
+
+    def __init__(self):
+        self.histogram = [0] * (JITTER_BINS + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, lateness):
+        self.count += 1
+        self.total += lateness
+        self.max = max(self.max, lateness)
+        index = min(int(lateness * 1_000_000 / JITTER_BIN_US), JITTER_BINS)
+        self.histogram[max(index, 0)] += 1
+
+    def percentile(self, share):
+        if not self.count:
+            return 0.0
+        target = share * self.count
+        seen = 0
+        for index, amount in enumerate(self.histogram):
+            seen += amount
+            if seen >= target:
+                # Последняя корзина без верхней границы: про её события известен только максимум
+                if index == JITTER_BINS:
+                    return self.max
+                # Верхняя граница корзины может оказаться больше самого максимума
+                return min((index + 1) * JITTER_BIN_US / 1_000_000, self.max)
+        return self.max
+
+    def summary(self):
+        mean = self.total / self.count if self.count else 0.0
+        return (f"событий: {self.count}, джиттер: среднее {mean * 1000:.2f} мс, "
+                f"p50 {self.percentile(0.5) * 1000:.2f} мс, "
+                f"p99 {self.percentile(0.99) * 1000:.2f} мс, "
+                f"макс {self.max * 1000:.2f} мс")
+
+
+def _raise_priority():
+    """Пытается поднять приоритет текущего потока; без прав просто ничего не делает"""
+    try:
+        if sys.platform == 'win32':
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            kernel32.SetThreadPriority(kernel32.GetCurrentThread(), 15)  # TIME_CRITICAL
+        elif hasattr(os, 'setpriority'):
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), -10)
+    except (OSError, AttributeError):
+        pass
+
+
+class MidiSequencer(threading.Thread):
+    """Поток, который выдаёт события MIDI-файла точно по времени.
+
+    note_on(note, velocity) и note_off(note) вызываются из этого потока,
+    цикл событий Qt в расписании не участвует.
+    """
+
+    def __init__(self, path, note_on, note_off, finished=None):
+        super().__init__(daemon=True)
+        self.path = path
+        self.note_on = note_on
+        self.note_off = note_off
+        self.finished = finished
+        self.stop_event = threading.Event()
+        self.stats = JitterStats()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run(self):
+        _raise_priority()
+        started = time.perf_counter()
+        sounding = set()
+
+        try:
+            for event_time, kind, (channel, note, velocity) in iter_events(self.path):
+                target = started + event_time
+                if not self.wait_until(target):
+                    break
+                self.stats.add(time.perf_counter() - target)
+
+                if kind == NOTE_ON:
+                    sounding.add(note)
+                    self.note_on(note, velocity)
+                else:
+                    sounding.discard(note)
+                    self.note_off(note)
+        finally:
+            for note in sounding:
+                self.note_off(note)
+            if self.finished is not None:
+                self.finished(self.stats)
+
+    def wait_until(self, target):
+        """Спит почти до target, последние миллисекунды ждёт активно"""
+        while True:
+            remaining = target - time.perf_counter()
+            if remaining <= 0:
+                return not self.stop_event.is_set()
+            if remaining > SPIN_SECONDS:
+                if self.stop_event.wait(remaining - SPIN_SECONDS):
+                    return False
+            elif self.stop_event.is_set():
+                return False
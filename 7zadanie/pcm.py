@@ -0,0 +1,69 @@
+# pcm.py
+import numpy as np
+
+# Формат, в котором звуки хранятся в памяти и выводятся на звуковую карту
+SAMPLE_RATE = 44100
+
+# Готовый банк всех полутонов, его собирает build_samples.py
+BANK_FILE = "bank.npz"
+
+# Общая громкость микса и порог мягкого ограничителя
+MASTER_GAIN = 0.5
+KNEE = 0.8
+
+
+def soft_clip(out, knee=KNEE):
+    """Мягкое ограничение: до knee сигнал не меняется, выше плавно стремится к 1"""
+    over = np.abs(out) > knee
+    if over.any():
+        peaks = out[over]
+        headroom = 1.0 - knee
+        out[over] = np.sign(peaks) * (knee + headroom * np.tanh((np.abs(peaks) - knee) / headroom))
+    return out
+
+
+def source_notes(sound_dir):
+    """Исходные сэмплы {нота: файл}: имя файла - имя ноты"""
+    return {path.stem: path.name for path in sorted(sound_dir.glob("*.mp3"))}
+
+
+def source_signature(sound_dir, notes):
+    """Описание исходных файлов: банк устарел, если оно изменилось"""
+    signature = []
+    for note, filename in sorted(notes.items()):
+        path = sound_dir / filename
+        if path.exists():
+            stat = path.stat()
+            signature.append(f"{note}:{filename}:{stat.st_size}:{stat.st_mtime_ns}")
+    return signature
+
+
+def save_bank(path, samples, signature):
+    """Сохраняет сэмплы в сжатый npz как int16"""
+    arrays = {
+        note: (np.clip(data, -1.0, 1.0) * 32767).astype(np.int16)
+        for note, data in samples.items()
+    }
+    np.savez_compressed(path, __sources__=np.array(signature), **arrays)
+
+
+def load_bank(path, signature):
+    """Загружает банк, если он собран из тех же исходников, иначе None"""
+    try:
+        with np.load(path) as bank:
+            if list(bank["__sources__"]) != signature:
+                return None
+            return {
+                note: bank[note].astype(np.float32) / 32768
+                for note in bank.files
+                if note != "__sources__"
+            }
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def to_int16(out):
+    """Микс float в PCM int16 так же, как на выходе микшера"""
+    out = out * MASTER_GAIN
+    soft_clip(out)
+    return (out * 32767).astype('<i2')
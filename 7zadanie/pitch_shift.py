@@ -0,0 +1,80 @@
+# pitch_shift.py
+import re
+import numpy as np
+
+NOTE_NAMES = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
+SEMITONES = {'C': 0, 'D': 2, 'E': 4, 'F': 5, 'G': 7, 'A': 9, 'B': 11}
+
+# Полуширина окна интерполятора в отсчётах: больше - чище, но медленнее
+SINC_TAPS = 16
+
+
+def parse_note(name):
+    """MIDI-номер ноты по имени вида 'C4', 'C4#' (как в sounds/) или 'C#4'"""
+    match = re.fullmatch(r'([A-G])(#?)(-?\d)(#?)', name)
+    if not match:
+        raise ValueError(f"Неверное имя ноты: '{name}'")
+    letter, sharp_before, octave, sharp_after = match.groups()
+    sharp = 1 if (sharp_before or sharp_after) else 0
+    return (int(octave) + 1) * 12 + SEMITONES[letter] + sharp
+
+
+def note_name(midi):
+    """Имя ноты в стиле файлов из sounds/: буква, октава, затем '#'"""
+    name = NOTE_NAMES[midi % 12]
+    octave = midi // 12 - 1
+    return f"{name[0]}{octave}{name[1:]}"
+
+
+def nearest_source(midi, sources):
+    """Ближайший по высоте исходный сэмпл; при равенстве - с точным именем"""
+    return min(
+        sources,
+        key=lambda name: (abs(parse_note(name) - midi), name != note_name(midi))
+    )
+
+
+def resample(data, ratio, taps=SINC_TAPS, chunk=8192):
+    """Читает data с шагом ratio интерполятором windowed-sinc.
+
+    ratio > 1 повышает высоту звука (и укорачивает его), в этом случае
+    полоса сигнала заранее сужается, чтобы не было наложения спектров.
+    """
+    data = np.asarray(data, dtype=np.float64)
+    if ratio == 1.0:
+        return data.astype(np.float32)
+
+    length = int(len(data) / ratio)
+    cutoff = min(1.0, 1.0 / ratio)
+    offsets = np.arange(-taps + 1, taps + 1)
+    padded = np.concatenate([np.zeros(taps), data, np.zeros(taps + 1)])
+
+    out = np.empty(length, dtype=np.float32)
+    for start in range(0, length, chunk):
+        positions = np.arange(start, min(start + chunk, length)) * ratio
+        base = np.floor(positions).astype(np.int64)
+        frac = positions - base
+
+        # Расстояния от точки чтения до соседних отсчётов: (n, 2 * taps)
+        distance = frac[:, None] - offsets[None, :]
+        window = 0.5 + 0.5 * np.cos(np.pi * np.clip(distance / taps, -1.0, 1.0))
+        kernel = cutoff * np.sinc(cutoff * distance) * window
+
+        neighbours = padded[base[:, None] + offsets[None, :] + taps]
+        out[start:start + len(positions)] = (neighbours * kernel).sum(axis=1)
+
+    return out
+
+
+def shift_semitones(data, semitones):
+    """Сдвигает высоту сэмпла на semitones полутонов"""
+    return resample(data, 2.0 ** (semitones / 12.0))
+
+
+def build_bank(sources, low, high):
+    """Сэмплы всех нот low..high (MIDI) из словаря {имя: массив} исходников"""
+    bank = {}
+    for midi in range(low, high + 1):
+        source = nearest_source(midi, sources)
+        bank[note_name(midi)] = shift_semitones(sources[source], midi - parse_note(source))
+    return bank
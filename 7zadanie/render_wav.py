@@ -0,0 +1,153 @@
+# render_wav.py
+"""Офлайн-рендер последовательности нот в WAV без воспроизведения.
+
+Примеры:
+    python render_wav.py out.wav --notes "C4 D4 E4:2 R C4+E4+G4:4"
+    python render_wav.py out.wav --notes-file melody.txt --bpm 90
+    python render_wav.py out.wav --midi song.mid
+"""
+import sys
+import math
+import time
+import wave
+import argparse
+from pathlib import Path
+import numpy as np
+
+from pcm import SAMPLE_RATE, BANK_FILE, load_bank, source_notes, source_signature, to_int16
+from pitch_shift import note_name, parse_note
+from midi_sequencer import iter_events, NOTE_ON
+
+# Затухание в конце ноты, чтобы обрыв сэмпла не щёлкал
+RELEASE_SECONDS = 0.05
+
+
+def parse_sequence(text, bpm):
+    """Разбирает строку вида 'C4 D4:2 R C4+E4+G4:4' в список нот.
+
+    Токен - ноты через '+' (аккорд) или R (пауза), после ':' длительность
+    в долях; по умолчанию одна доля. Возвращает [(время, MIDI, громкость,
+    длительность)] в секундах.
+    """
+    beat = 60.0 / bpm
+    events = []
+    now = 0.0
+    for token in text.split():
+        name, _, beats = token.partition(':')
+        try:
+            duration = float(beats or 1) * beat
+            if not math.isfinite(duration) or duration <= 0:
+                raise ValueError("длительность должна быть положительным числом долей")
+            notes = [] if name.upper() == 'R' else [parse_note(part) for part in name.split('+')]
+        except ValueError as e:
+            raise ValueError(f"Неверный токен '{token}': {e}") from None
+        for midi in notes:
+            events.append((now, midi, 1.0, duration))
+        now += duration
+    return events
+
+
+def midi_sequence(path):
+    """Ноты MIDI-файла в том же виде, что и parse_sequence"""
+    events = []
+    started = {}
+    for event_time, kind, (channel, note, velocity) in iter_events(path):
+        key = (channel, note)
+        if kind == NOTE_ON:
+            started.setdefault(key, []).append((event_time, velocity))
+        elif started.get(key):
+            start, velocity = started[key].pop(0)
+            events.append((start, note, velocity / 127, event_time - start))
+    # Ноты без выключения звучат до конца сэмпла
+    for (channel, note), pending in started.items():
+        for start, velocity in pending:
+            events.append((start, note, velocity / 127, None))
+    events.sort(key=lambda event: (event[0], event[1]))
+    return events
+
+
+def render(events, samples, sample_rate=SAMPLE_RATE):
+    """Смешивает ноты в один буфер и возвращает PCM int16.
+
+    Каждая нота добавляется к буферу одним векторным сложением среза.
+    Порядок сложения фиксирован (события отсортированы), поэтому одинаковый
+    банк сэмплов даёт побитово одинаковый результат.
+    """
+    release = int(RELEASE_SECONDS * sample_rate)
+    fade = np.linspace(1.0, 0.0, release)
+
+    notes = []
+    end = 0
+    for start_time, midi, gain, duration in events:
+        sample = samples.get(note_name(midi))
+        if sample is None:
+            continue
+        start = int(round(start_time * sample_rate))
+        length = len(sample)
+        if duration is not None:
+            length = min(length, int(round(duration * sample_rate)) + release)
+        notes.append((start, sample, gain, length, duration is not None))
+        end = max(end, start + length)
+
+    out = np.zeros(end, dtype=np.float64)
+    for start, sample, gain, length, released in notes:
+        chunk = sample[:length] * gain
+        if released and length < len(sample):
+            # Нота короче затухания гаснет до нуля за свою длину, иначе будет щелчок
+            tail = min(release, length)
+            chunk[-tail:] *= fade if tail == release else np.linspace(1.0, 0.0, tail)
+        out[start:start + length] += chunk
+
+    return to_int16(out)
+
+
+def write_wav(path, pcm, sample_rate=SAMPLE_RATE):
+    with wave.open(str(path), 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(pcm.tobytes())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Рендер нот в WAV без воспроизведения")
+    parser.add_argument("output", help="выходной WAV-файл")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--notes", help="последовательность нот строкой")
+    source.add_argument("--notes-file", help="файл с последовательностью нот")
+    source.add_argument("--midi", help="MIDI-файл")
+    parser.add_argument("--bpm", type=float, default=120)
+    args = parser.parse_args(argv)
+    if not math.isfinite(args.bpm) or args.bpm <= 0:
+        parser.error("--bpm должен быть положительным числом")
+
+    if args.midi:
+        events = midi_sequence(args.midi)
+    else:
+        text = args.notes
+        if args.notes_file:
+            text = Path(args.notes_file).read_text(encoding='utf-8')
+        try:
+            events = parse_sequence(text, args.bpm)
+        except ValueError as e:
+            parser.error(str(e))
+
+    sound_dir = Path(__file__).parent / "sounds"
+    samples = load_bank(sound_dir / BANK_FILE, source_signature(sound_dir, source_notes(sound_dir)))
+    if samples is None:
+        print("Банк сэмплов не найден или устарел, запустите build_samples.py")
+        return 1
+
+    started = time.perf_counter()
+    pcm = render(events, samples)
+    elapsed = time.perf_counter() - started
+    write_wav(args.output, pcm)
+
+    duration = len(pcm) / SAMPLE_RATE
+    print(f"Нот: {len(events)}, длительность {duration:.1f} с, рендер {elapsed:.2f} с "
+          f"({duration / max(elapsed, 1e-9):.0f}x реального времени)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
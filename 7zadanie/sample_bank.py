@@ -0,0 +1,128 @@
+# sample_bank.py
+import numpy as np
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtMultimedia import QAudioDecoder, QAudioFormat
+
+from pcm import SAMPLE_RATE, BANK_FILE, load_bank, source_signature
+
+
+def pcm_format():
+    """Моно, 16 бит, SAMPLE_RATE: такой PCM отдаёт декодер и ест QAudioOutput"""
+    fmt = QAudioFormat()
+    fmt.setSampleRate(SAMPLE_RATE)
+    fmt.setChannelCount(1)
+    fmt.setSampleSize(16)
+    fmt.setCodec("audio/pcm")
+    fmt.setByteOrder(QAudioFormat.LittleEndian)
+    fmt.setSampleType(QAudioFormat.SignedInt)
+    return fmt
+
+
+def buffer_to_array(buffer):
+    """Переводит QAudioBuffer в моно float32 [-1, 1]"""
+    fmt = buffer.format()
+    raw = buffer.constData().asstring(buffer.byteCount())
+
+    if fmt.sampleType() == QAudioFormat.Float:
+        data = np.frombuffer(raw, dtype=np.float32)
+    elif fmt.sampleSize() == 8:
+        data = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif fmt.sampleSize() == 32:
+        data = np.frombuffer(raw, dtype=np.int32).astype(np.float32) / 2**31
+    else:
+        data = np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 2**15
+
+    channels = fmt.channelCount()
+    if channels > 1:
+        data = data.reshape(-1, channels).mean(axis=1)
+    return data, fmt.sampleRate()
+
+
+def resample(data, rate, target_rate=SAMPLE_RATE):
+    """Приводит частоту дискретизации, если декодер не выдал нужную"""
+    if rate == target_rate or len(data) == 0:
+        return data
+    length = int(round(len(data) * target_rate / rate))
+    positions = np.arange(length) * (rate / target_rate)
+    return np.interp(positions, np.arange(len(data)), data).astype(np.float32)
+
+
+class SampleBank(QObject):
+    """Один раз декодирует все звуки из sounds/ в PCM и держит их в памяти"""
+
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal()
+
+    def __init__(self, sound_dir, notes, parent=None):
+        super().__init__(parent)
+        self.sound_dir = sound_dir
+        self.notes = notes
+        self.samples = {}
+
+        self.queue = []
+        self.total = 0
+        self.current_note = None
+        self.chunks = []
+        self.chunk_rate = SAMPLE_RATE
+
+        # Декодер работает асинхронно, окно не ждёт окончания загрузки
+        self.decoder = QAudioDecoder(self)
+        self.decoder.setAudioFormat(pcm_format())
+        self.decoder.bufferReady.connect(self.read_buffer)
+        self.decoder.finished.connect(self.finish_note)
+        self.decoder.error.connect(self.skip_note)
+
+    def load(self):
+        """Загружает готовый банк полутонов или декодирует исходные файлы"""
+        bank = load_bank(self.sound_dir / BANK_FILE, source_signature(self.sound_dir, self.notes))
+        if bank is not None:
+            self.samples = bank
+            self.total = len(bank)
+            self.progress.emit(self.total, self.total)
+            self.finished.emit()
+            return
+
+        self.decode_sources()
+
+    def decode_sources(self):
+        """Ставит в очередь все существующие файлы и начинает декодирование"""
+        self.queue = [
+            (note, self.sound_dir / filename)
+            for note, filename in self.notes.items()
+            if (self.sound_dir / filename).exists()
+        ]
+        self.total = len(self.queue)
+        self.decode_next()
+
+    def decode_next(self):
+        if not self.queue:
+            self.current_note = None
+            self.finished.emit()
+            return
+
+        self.current_note, path = self.queue.pop(0)
+        self.chunks = []
+        self.decoder.setSourceFilename(str(path))
+        self.decoder.start()
+
+    def read_buffer(self):
+        data, rate = buffer_to_array(self.decoder.read())
+        self.chunks.append(data)
+        self.chunk_rate = rate
+
+    def finish_note(self):
+        if self.chunks:
+            data = np.concatenate(self.chunks)
+            self.samples[self.current_note] = resample(data, self.chunk_rate)
+        self.decoder.stop()
+        self.progress.emit(len(self.samples), self.total)
+        self.decode_next()
+
+    def skip_note(self, *args):
+        print(f"Не удалось декодировать {self.current_note}: {self.decoder.errorString()}")
+        self.decoder.stop()
+        self.progress.emit(len(self.samples), self.total)
+        self.decode_next()
+
+    def is_loaded(self):
+        return self.current_note is None and not self.queue
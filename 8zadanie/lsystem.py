@@ -0,0 +1,278 @@
+# lsystem.py
+import sys
+import time
+from collections import Counter
+
+from rule_engine import CompiledRules, parse_rules, simple_rules
+
+# Предел длины поколения: дальше шаги на слайдере не открываются
+MAX_SYMBOLS = 500_000_000
+
+# Сколько памяти могут занимать закэшированные поколения и их геометрия
+CACHE_BUDGET = 1024 * 1024 * 1024
+
+# Поколения длиннее этого не строятся целиком, а разворачиваются лениво
+MATERIALIZE_LIMIT = 20_000_000
+# Самый длинный кусок, который ленивый обход отдаёт и запоминает целиком
+LAZY_CHUNK = 64 * 1024
+
+
+def read_lsystem(path):
+    """Файл L-системы: название, число делений угла, аксиома, правила, параметры.
+
+    Строки: название, число делений полного оборота, аксиома, затем правила
+    вида 'F F-F++F-F'. Левая часть правила может быть несколькими символами
+    ('AB X'), иметь контекст ('A<B>C X') и вес ('F:0.3 F[+F]F'). Строки
+    '@seed 42' и '@ignore +-' задают seed стохастических правил и символы,
+    которые пропускаются при проверке контекста. Пустые строки пропускаются.
+    Правила возвращаются списком пар (левая часть, преемник) по порядку.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = [line.strip() for line in f.readlines() if line.strip()]
+
+    if len(lines) < 3:
+        raise ValueError("Файл должен содержать минимум 3 строки.")
+
+    rules = []
+    options = {}
+    for line in lines[3:]:
+        parts = line.split(maxsplit=1)
+        if parts[0] == '@seed' and len(parts) == 2:
+            # np.random.default_rng принимает только неотрицательные seed
+            if not parts[1].isdigit():
+                raise ValueError(f"@seed должен быть неотрицательным целым: '{parts[1]}'")
+            options['seed'] = int(parts[1])
+        elif parts[0] == '@ignore' and len(parts) == 2:
+            options['ignore'] = parts[1].replace(' ', '')
+        elif len(parts) == 2:
+            key, value = parts
+            rules.append((key, value.replace(' ', '')))
+    return lines[0], int(lines[1]), lines[2], rules, options
+
+
+class LSystemExpander:
+    """Переписывает поколения L-системы за линейное время.
+
+    Каждый символ с правилом сначала одним проходом str.translate
+    заменяется на свой служебный управляющий символ, затем каждый такой
+    символ - на правую часть правила через str.replace. Оба шага идут
+    на C и не делают посимвольной конкатенации в Python.
+
+    rules - словарь или пары (левая часть, преемник). Многосимвольные,
+    контекстные и стохастические правила компилируются в CompiledRules;
+    тогда rules пуст, а длины поколений - оценка сверху.
+    """
+
+    def __init__(self, axiom, rules, seed=0, ignore=''):
+        parsed = parse_rules(rules.items() if isinstance(rules, dict) else rules)
+        self.axiom = axiom
+        self.compiled = None
+        simple = simple_rules(parsed)
+        if simple is None:
+            self.compiled = CompiledRules(parsed, axiom, seed, ignore)
+            self.rules = {}
+            self.growth = self.compiled.growth
+            return
+
+        self.rules = {key: value for key, value in simple.items() if key != value}
+        self.growth = {key: Counter(value) for key, value in self.rules.items()}
+
+        used = set(axiom) | set(self.rules) | set(''.join(self.rules.values()))
+        free = [chr(code) for code in range(1, 32) if chr(code) not in used]
+        if len(free) >= len(self.rules):
+            marks = dict(zip(self.rules, free))
+            self.mark_table = str.maketrans(marks)
+            self.replacements = [(marks[key], value) for key, value in self.rules.items()]
+        else:
+            # Служебных символов не хватило: одна общая таблица замен
+            self.mark_table = str.maketrans(self.rules)
+            self.replacements = []
+
+    @property
+    def context_free(self):
+        """Обычные правила: поколение можно разворачивать кусками независимо"""
+        return self.compiled is None
+
+    def rewrite(self, sequence, step=1):
+        """Поколение step из предыдущего; step нужен стохастическим правилам"""
+        if self.compiled is not None:
+            return self.compiled.rewrite(sequence, step)
+        sequence = sequence.translate(self.mark_table)
+        for mark, value in self.replacements:
+            sequence = sequence.replace(mark, value)
+        return sequence
+
+    def expand(self, steps):
+        """Поколение steps, начиная с аксиомы"""
+        sequence = self.axiom
+        for step in range(1, steps + 1):
+            sequence = self.rewrite(sequence, step)
+        return sequence
+
+    def predict_lengths(self, steps):
+        """Длины поколений 0..steps без их построения: считаем только символы"""
+        growth = self.growth
+        counts = Counter(self.axiom)
+        lengths = [len(self.axiom)]
+        for _ in range(steps):
+            following = Counter()
+            for char, amount in counts.items():
+                rule = growth.get(char)
+                if rule is None:
+                    following[char] += amount
+                else:
+                    for produced, times in rule.items():
+                        following[produced] += amount * times
+            counts = following
+            lengths.append(sum(counts.values()))
+        return lengths
+
+    def max_steps(self, limit=MAX_SYMBOLS, ceiling=64):
+        """Последний шаг, длина которого не превышает limit символов"""
+        if not self.context_free:
+            # Такие поколения строятся только целиком
+            limit = min(limit, MATERIALIZE_LIMIT)
+        lengths = self.predict_lengths(ceiling)
+        steps = 0
+        for step, length in enumerate(lengths):
+            if length > limit:
+                break
+            steps = step
+        return steps
+
+
+def sequence_bytes(sequence):
+    """Сколько памяти занимает строка поколения"""
+    return sys.getsizeof(sequence)
+
+
+class LazyExpansion:
+    """Поколение L-системы как поток кусков строки, без построения целиком.
+
+    Дерево перезаписей обходится в глубину с явным стеком, поэтому память
+    пропорциональна глубине, умноженной на длину самого длинного правила.
+    Полные развёртки символа на небольшую глубину, если они короче
+    LAZY_CHUNK, запоминаются и отдаются одним куском.
+    """
+
+    def __init__(self, axiom, rules, chunk=LAZY_CHUNK):
+        self.axiom = axiom
+        self.rules = rules
+        self.chunk = chunk
+        self.memo = {}
+
+    def small_expansion(self, symbol, level):
+        """Развёртка symbol на level шагов, если она не длиннее chunk, иначе None"""
+        key = (symbol, level)
+        if key in self.memo:
+            return self.memo[key]
+
+        rule = self.rules.get(symbol)
+        if level == 0 or rule is None:
+            result = symbol
+        else:
+            parts = []
+            size = 0
+            for char in rule:
+                part = self.small_expansion(char, level - 1)
+                if part is None:
+                    result = None
+                    break
+                size += len(part)
+                if size > self.chunk:
+                    result = None
+                    break
+                parts.append(part)
+            else:
+                result = ''.join(parts)
+
+        self.memo[key] = result
+        return result
+
+    def chunks(self, depth):
+        """Генератор кусков поколения depth по порядку"""
+        stack = [(iter(self.axiom), depth)]
+        while stack:
+            symbols, level = stack[-1]
+            for char in symbols:
+                piece = self.small_expansion(char, level)
+                if piece is not None:
+                    yield piece
+                else:
+                    stack.append((iter(self.rules[char]), level - 1))
+                    break
+            else:
+                stack.pop()
+
+
+class Generation:
+    """Закэшированное поколение и построенная по нему геометрия"""
+
+    def __init__(self, sequence, rewrite_seconds=0.0):
+        self.sequence = sequence
+        self.geometry = None
+        self.rewrite_seconds = rewrite_seconds  # перезапись из предыдущего шага
+
+    @property
+    def nbytes(self):
+        size = sequence_bytes(self.sequence)
+        if self.geometry is not None:
+            size += self.geometry.nbytes
+        return size
+
+
+class GenerationCache:
+    """Кэш поколений по шагам с бюджетом памяти.
+
+    Шаг n строится из ближайшего закэшированного шага ниже, так что переход
+    n -> n+1 - одна перезапись. При переполнении первыми вытесняются самые
+    большие поколения; аксиома и только что запрошенный шаг остаются.
+    """
+
+    def __init__(self, expander, budget=CACHE_BUDGET):
+        self.expander = expander
+        self.budget = budget
+        self.generations = {0: Generation(expander.axiom)}
+        self.last_rewrites = 0
+
+    def sequence(self, step, on_rewrite=None):
+        """Поколение шага; on_rewrite(сделано, всего) вызывается после каждой перезаписи"""
+        generation = self.generations.get(step)
+        if generation is None:
+            base = max(cached for cached in self.generations if cached < step)
+            sequence = self.generations[base].sequence
+            for current in range(base + 1, step + 1):
+                started = time.perf_counter()
+                sequence = self.expander.rewrite(sequence, current)
+                self.generations[current] = Generation(sequence, time.perf_counter() - started)
+                self.evict(keep=current)
+                if on_rewrite is not None:
+                    on_rewrite(current - base, step - base)
+            self.last_rewrites = step - base
+            generation = self.generations[step]
+        else:
+            self.last_rewrites = 0
+        return generation.sequence
+
+    def geometry(self, step, build):
+        """Геометрия шага; build(sequence) вызывается только при промахе"""
+        # Повторный sequence() на попадании обнулил бы last_rewrites
+        if step not in self.generations:
+            self.sequence(step)
+        generation = self.generations[step]
+        if generation.geometry is None:
+            generation.geometry = build(generation.sequence)
+            self.evict(keep=step)
+        return generation.geometry
+
+    def nbytes(self):
+        return sum(generation.nbytes for generation in self.generations.values())
+
+    def evict(self, keep):
+        used = self.nbytes()
+        while used > self.budget:
+            candidates = [step for step in self.generations if step not in (0, keep)]
+            if not candidates:
+                break
+            largest = max(candidates, key=lambda step: self.generations[step].nbytes)
+            used -= self.generations.pop(largest).nbytes
@@ -1,31 +1,52 @@
 # main.py
 import sys
-import math
 from pathlib import Path
 from PyQt5.QtWidgets import QApplication, QMainWindow, QFileDialog, QMessageBox
 
-from PyQt5.QtGui import QPainter, QPen, QColor, QPixmap
-from PyQt5.QtCore import Qt
-from PyQt5.uic import loadUi
+from PyQt5.QtCore import QEvent, Qt
+from PyQt5.QtGui import QPixmap
 
+from l_system_ui import Ui_MainWindow
 
-class LSystemApp(QMainWindow):
+from lsystem import LSystemExpander, read_lsystem
+from render_worker import FractalScene, RenderWorker
+from tile_view import FractalView
+
+
+class LSystemApp(QMainWindow, Ui_MainWindow):
     def __init__(self):
         super().__init__()
 
-        ui_file = Path(__file__).parent / "l_system.ui"
-        if not ui_file.exists():
-            raise FileNotFoundError(f"Не найден файл: {ui_file}")
-        loadUi(str(ui_file), self)
+        self.setupUi(self)
 
         # Данные L-системы
         self.axiom = ""
         self.rules = {}
         self.angle_divisions = 5
         self.system_name = ""
-        self.current_sequence = ""
+        self.expander = None
+        self.scene = None
         self.max_steps = 5
 
+        # Разворачивание и отрисовка идут в отдельном потоке
+        self.render_job = 0
+        self.render_worker = RenderWorker(self)
+        self.render_worker.frame_ready.connect(self.show_frame)
+        self.render_worker.progress.connect(self.show_render_progress)
+        self.render_worker.finished_job.connect(self.show_render_done)
+        self.render_worker.geometry_ready.connect(self.set_view_geometry)
+        self.render_worker.tile_ready.connect(self.show_tile)
+        self.render_worker.start()
+
+        # Колесо - масштаб, перетаскивание - сдвиг, двойной щелчок - весь рисунок
+        self.view = FractalView()
+        self.frame_image = None
+        # Задание, приславшее геометрию вида: плитки от более ранних к ней не относятся
+        self.view_job = 0
+        self.missing_tiles = set()
+        self.drag_origin = None
+        self.canvas.installEventFilter(self)
+
         # Текущий шаг
         self.step = 0
 
@@ -55,22 +76,14 @@ class LSystemApp(QMainWindow):
             return
 
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                lines = [line.strip() for line in f.readlines() if line.strip()]
-
-            if len(lines) < 3:
-                raise ValueError("Файл должен содержать минимум 3 строки.")
+            (self.system_name, self.angle_divisions, self.axiom,
+             self.rules, options) = read_lsystem(file_path)
 
-            self.system_name = lines[0]
-            self.angle_divisions = int(lines[1])
-            self.axiom = lines[2]
-
-            self.rules = {}
-            for line in lines[3:]:
-                parts = line.split(maxsplit=1)
-                if len(parts) == 2:
-                    key, value = parts
-                    self.rules[key] = value.replace(' ', '')  
+            # Сколько шагов открыть, решаем по предсказанной длине поколений
+            self.expander = LSystemExpander(self.axiom, self.rules, **options)
+            self.max_steps = self.expander.max_steps()
+            self.scene = FractalScene(self.expander, self.angle_divisions, self.max_steps)
+            self.evolution_slider.setMaximum(self.max_steps)
 
             self.system_name_label.setText(f"<b>{self.system_name}</b>")
             self.evolution_slider.setEnabled(True)
@@ -82,75 +95,118 @@ class LSystemApp(QMainWindow):
             self.close()
 
     def update_step(self, step):
-        """Обновляет последовательность и перерисовывает"""
+        """Запрашивает отрисовку шага в фоне; предыдущая отрисовка отменяется"""
         self.step = step
-        sequence = self.axiom
-        for _ in range(step):
-            next_seq = ""
-            for char in sequence:
-                next_seq += self.rules.get(char, char)
-            sequence = next_seq
-        self.current_sequence = sequence
         self.step_label.setText(str(step))
         self.draw_fractal()
 
-    def draw_fractal(self):
-        """Рисует фрактал с помощью QPainter"""
+    def canvas_size(self):
         size = self.canvas.size()
         w, h = size.width(), size.height()
 
         if w < 10 or h < 10:
             w = h = 600
+        return w, h
 
-        pixmap = QPixmap(w, h)
-        pixmap.fill(Qt.white)
-        painter = QPainter(pixmap)
-        painter.setRenderHint(QPainter.Antialiasing)
-        painter.translate(w // 2, h // 2)
-
-        length = 5 if self.step < 4 else 2
-        angle_deg = 360 / self.angle_divisions
-        direction = 0  
-        stack = []
-        x, y = 0, 0
-
-        for cmd in self.current_sequence:
-            if cmd in 'FAB':  
-                dx = length * math.cos(math.radians(direction))
-                dy = length * math.sin(math.radians(direction))
-                painter.setPen(QPen(Qt.black, 1))
-                painter.drawLine(int(x), int(y), int(x + dx), int(y + dy))
-                x += dx
-                y += dy
-            elif cmd == 'f':  
-                dx = length * math.cos(math.radians(direction))
-                dy = length * math.sin(math.radians(direction))
-                x += dx
-                y += dy
-            elif cmd == '+':
-                direction += angle_deg
-            elif cmd == '-':
-                direction -= angle_deg
-            elif cmd == '[':
-                stack.append((x, y, direction))
-            elif cmd == ']':
-                if stack:
-                    x, y, direction = stack.pop()
-
-        painter.end()
-
-        scaled_pixmap = pixmap.scaled(
-            self.canvas.size(),
-            Qt.KeepAspectRatio,
-            Qt.SmoothTransformation
+    def draw_fractal(self):
+        """Отдаёт отрисовку текущего шага потоку под размер холста"""
+        if self.scene is None:
+            return
+        # Масштаб снова доступен, когда поток пришлёт геометрию нового шага
+        self.view.set_geometry(None, 0, 0, 1.0)
+        w, h = self.canvas_size()
+        self.render_job = self.render_worker.request(
+            self.scene, self.step, w, h, self.canvas.devicePixelRatioF()
         )
-        self.canvas.setPixmap(scaled_pixmap)
+
+    def set_view_geometry(self, job_id, geometry):
+        if job_id == self.render_job:
+            w, h = self.canvas_size()
+            self.view_job = job_id
+            self.view.set_geometry(geometry, w, h, self.canvas.devicePixelRatioF(), self.frame_image)
+
+    def show_view(self):
+        """Увеличенный вид из готовых плиток; недостающие рисует поток отрисовки"""
+        if not self.view.zoomed:
+            self.draw_fractal()
+            return
+        pixmap, missing = self.view.compose(*self.canvas_size())
+        self.canvas.setPixmap(pixmap)
+        self.missing_tiles = set(missing)
+        if missing:
+            self.render_worker.request_tiles(self.view.geometry, self.view.scale(), missing)
+        self.show_view_status()
+
+    def show_tile(self, job_id, key, tile):
+        """Плитка из потока отрисовки встаёт на место заглушки"""
+        if self.view.geometry is None or job_id <= self.view_job:
+            return
+        self.missing_tiles.discard(key)
+        if self.view.add_tile(key, tile) and self.view.zoomed:
+            self.canvas.setPixmap(self.view.pixmap())
+            self.show_view_status()
+
+    def show_view_status(self):
+        message = f"Шаг {self.step}: {self.view.describe()}"
+        if self.missing_tiles:
+            message += f"; рисуется плиток: {len(self.missing_tiles)}"
+        self.statusBar().showMessage(message)
+
+    def eventFilter(self, obj, event):
+        if obj is not self.canvas or self.view.geometry is None:
+            return super().eventFilter(obj, event)
+
+        kind = event.type()
+        if kind == QEvent.Wheel:
+            steps = 1 if event.angleDelta().y() > 0 else -1
+            pos = event.position() if hasattr(event, 'position') else event.posF()
+            if self.view.zoom(steps, pos.x(), pos.y(), *self.canvas_size()):
+                self.show_view()
+            return True
+        if kind == QEvent.MouseButtonPress and event.button() == Qt.LeftButton:
+            self.drag_origin = event.pos()
+            return True
+        if kind == QEvent.MouseMove and self.drag_origin is not None:
+            delta = event.pos() - self.drag_origin
+            self.drag_origin = event.pos()
+            if self.view.pan(delta.x(), delta.y()):
+                self.show_view()
+            return True
+        if kind == QEvent.MouseButtonRelease:
+            self.drag_origin = None
+            return True
+        if kind == QEvent.MouseButtonDblClick:
+            if self.view.zoomed:
+                self.view.reset()
+                self.draw_fractal()
+            return True
+        return super().eventFilter(obj, event)
+
+    def show_frame(self, job_id, image):
+        """Промежуточный или готовый кадр из потока отрисовки"""
+        if job_id == self.render_job and not self.view.zoomed:
+            self.frame_image = image
+            self.canvas.setPixmap(QPixmap.fromImage(image))
+
+    def show_render_progress(self, job_id, share, elapsed):
+        if job_id == self.render_job:
+            self.statusBar().showMessage(
+                f"Шаг {self.step}: отрисовка {share * 100:.0f}%, {elapsed:.1f} с"
+            )
+
+    def show_render_done(self, job_id, message):
+        if job_id == self.render_job:
+            self.statusBar().showMessage(message)
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
         if self.evolution_slider.isEnabled():
             self.draw_fractal()
 
+    def closeEvent(self, event):
+        self.render_worker.stop()
+        super().closeEvent(event)
+
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
@@ -0,0 +1,161 @@
+# parallel_expand.py
+"""Параллельное разворачивание больших поколений L-системы в файл.
+
+Поколение n делится на куски по раннему поколению k: каждый символ
+поколения k разворачивается в свой участок поколения n независимо от
+соседей, поэтому куски переписываются в разных процессах и пишутся сразу
+на своё место в общем memory-mapped файле (по байту на символ).
+
+Пример:
+    python parallel_expand.py koch.txt 16 koch16.bin --workers 8 --check
+"""
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from lsystem import LSystemExpander, LazyExpansion, read_lsystem
+
+# Задач на процесс: куски разной сложности выравниваются по времени
+TASKS_PER_WORKER = 4
+# По сколько байт поколение читается обратно из файла
+READ_CHUNK = 1 << 20
+# Накопленные куски пишутся в файл порциями не меньше этой
+WRITE_CHUNK = 1 << 20
+
+
+def expansion_lengths(rules, alphabet, depth):
+    """Длина развёртки каждого символа на depth шагов, точными целыми"""
+    lengths = {char: 1 for char in alphabet}
+    for _ in range(depth):
+        lengths = {
+            char: sum(lengths[produced] for produced in rules[char]) if char in rules else 1
+            for char in alphabet
+        }
+    return lengths
+
+
+def _expand_part(task):
+    """Разворачивает кусок поколения k и пишет его в файл со своего смещения"""
+    path, offset, length, part, rules, steps = task
+    out = np.memmap(path, dtype=np.uint8, mode='r+', offset=offset, shape=(length,))
+    position = 0
+    pending = []
+    size = 0
+    for piece in LazyExpansion(part, rules).chunks(steps):
+        pending.append(piece)
+        size += len(piece)
+        if size >= WRITE_CHUNK:
+            out[position:position + size] = np.frombuffer(''.join(pending).encode('latin-1'), np.uint8)
+            position += size
+            pending.clear()
+            size = 0
+    if size:
+        out[position:position + size] = np.frombuffer(''.join(pending).encode('latin-1'), np.uint8)
+        position += size
+    out.flush()
+    del out
+    return position
+
+
+class MappedGeneration:
+    """Поколение в файле: читается по порядку кусками без загрузки целиком"""
+
+    def __init__(self, path, length):
+        self.path = path
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def chunks(self, size=READ_CHUNK):
+        """Генератор строк по size символов; подходит для iter_turtle_segments"""
+        if not self.length:
+            return
+        data = np.memmap(self.path, dtype=np.uint8, mode='r', shape=(self.length,))
+        for start in range(0, self.length, size):
+            yield data[start:start + size].tobytes().decode('latin-1')
+
+
+def expand_to_file(expander, steps, path, workers=None, tasks_per_worker=TASKS_PER_WORKER):
+    """Пишет поколение steps в path параллельно; результат совпадает с expand(steps)
+
+    Символы должны помещаться в latin-1, а правила - быть обычными
+    (без контекста, весов и многосимвольных левых частей), иначе ValueError.
+    """
+    if not expander.context_free:
+        raise ValueError("Параллельно разворачиваются только обычные правила")
+    rules = expander.rules
+    alphabet = set(expander.axiom) | set(rules) | set(''.join(rules.values()))
+    if any(ord(char) > 255 for char in alphabet):
+        raise ValueError("Для записи в файл символы L-системы должны быть в latin-1")
+
+    workers = workers or os.cpu_count()
+    tasks = workers * tasks_per_worker
+
+    # Ищем раннее поколение, в котором хватает символов на все задачи
+    base = 0
+    lengths = expander.predict_lengths(steps)
+    while base < steps and lengths[base] < tasks:
+        base += 1
+    source = expander.expand(base)
+
+    sizes = expansion_lengths(rules, alphabet, steps - base)
+    weights = np.array([sizes[char] for char in source], dtype=np.int64)
+    ends = np.cumsum(weights)
+    total = int(ends[-1]) if len(ends) else 0
+
+    # Режем так, чтобы на каждую задачу пришлась примерно равная доля вывода
+    targets = np.arange(1, tasks) * (total / tasks)
+    cuts = np.unique(np.concatenate(([0], np.searchsorted(ends, targets, side='right'), [len(source)])))
+    offsets = np.concatenate(([0], ends))[cuts]
+
+    with open(path, 'wb') as f:
+        f.truncate(total)
+
+    jobs = [
+        (str(path), int(offsets[i]), int(offsets[i + 1] - offsets[i]),
+         source[cuts[i]:cuts[i + 1]], rules, steps - base)
+        for i in range(len(cuts) - 1)
+        if offsets[i + 1] > offsets[i]
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for (_, _, length, *_), written in zip(jobs, pool.map(_expand_part, jobs)):
+            if written != length:
+                raise RuntimeError(f"Кусок записан не полностью: {written} из {length}")
+
+    return MappedGeneration(path, total)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Параллельное разворачивание поколения L-системы")
+    parser.add_argument("system", help="файл L-системы")
+    parser.add_argument("steps", type=int, help="номер поколения")
+    parser.add_argument("output", help="файл для поколения")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--check", action="store_true",
+                        help="сравнить с последовательным разворачиванием")
+    args = parser.parse_args(argv)
+
+    _, _, axiom, rules, options = read_lsystem(args.system)
+    expander = LSystemExpander(axiom, rules, **options)
+
+    started = time.perf_counter()
+    generation = expand_to_file(expander, args.steps, args.output, args.workers)
+    elapsed = time.perf_counter() - started
+    print(f"Поколение {args.steps}: {len(generation)} символов за {elapsed:.2f} с "
+          f"({len(generation) / max(elapsed, 1e-9) / 1e6:.0f} млн символов/с), "
+          f"процессов: {args.workers}")
+
+    if args.check:
+        expected = expander.expand(args.steps)
+        actual = ''.join(generation.chunks())
+        print("Совпадает с последовательным" if actual == expected else "РАСХОЖДЕНИЕ")
+        return 0 if actual == expected else 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,232 @@
+# render_poster.py
+"""Рендер L-системы в большой PNG или SVG без окна.
+
+Картинка рисуется полосами во всю ширину, так что целиком в памяти она
+не бывает: отрезки раскладываются по полосам во временные файлы, каждая
+полоса растрируется отдельно и сразу сжимается в поток PNG. SVG пишется
+по мере обхода.
+
+Примеры:
+    python render_poster.py koch.txt 12 koch.png --size 20000
+    python render_poster.py plant.txt 9 plant.svg --size 4000 --height 6000
+    python render_poster.py koch.txt 16 koch.png --size 20000 --workers 8
+"""
+import os
+import sys
+import time
+import zlib
+import struct
+import argparse
+import tempfile
+from pathlib import Path
+import numpy as np
+
+# Рисуем в QImage, дисплей не нужен
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtGui import QGuiApplication, QImage, QPainter, QPen
+from PyQt5.QtCore import Qt
+
+from lsystem import LSystemExpander, MATERIALIZE_LIMIT, read_lsystem
+from parallel_expand import expand_to_file
+from turtle_geometry import (
+    iter_turtle_segments, merge_bounds, polyline_runs, segment_bounds, simplify_segments,
+)
+from segment_painter import draw_segments, fit_transform
+
+# Высота полосы растра в пикселях
+BAND_HEIGHT = 512
+
+_app = None
+
+
+class PngWriter:
+    """PNG в оттенках серого, который пишется по строкам"""
+
+    def __init__(self, path, width, height, level=6):
+        self.file = open(path, 'wb')
+        self.width = width
+        self.compressor = zlib.compressobj(level)
+        self.file.write(b'\x89PNG\r\n\x1a\n')
+        self.chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 0, 0, 0, 0))
+
+    def chunk(self, kind, data):
+        self.file.write(struct.pack('>I', len(data)))
+        self.file.write(kind)
+        self.file.write(data)
+        self.file.write(struct.pack('>I', zlib.crc32(data, zlib.crc32(kind))))
+
+    def write_rows(self, rows):
+        """rows - массив (строки, ширина) uint8"""
+        filtered = np.zeros((len(rows), self.width + 1), dtype=np.uint8)
+        filtered[:, 1:] = rows  # фильтр 0 в начале каждой строки
+        data = self.compressor.compress(filtered.tobytes())
+        if data:
+            self.chunk(b'IDAT', data)
+
+    def close(self):
+        self.chunk(b'IDAT', self.compressor.flush())
+        self.chunk(b'IEND', b'')
+        self.file.close()
+
+
+class SvgWriter:
+    """SVG, в который ломаные дописываются по мере обхода"""
+
+    def __init__(self, path, width, height, pen_width):
+        self.file = open(path, 'w', encoding='utf-8')
+        self.file.write(
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+            f'viewBox="0 0 {width} {height}">\n'
+            f'<rect width="100%" height="100%" fill="white"/>\n'
+            f'<g fill="none" stroke="black" stroke-width="{pen_width:g}" '
+            f'stroke-linejoin="round" stroke-linecap="round">\n'
+        )
+
+    def write_segments(self, segments):
+        points, runs = polyline_runs(segments)
+        # Три знака после запятой: при увеличении мелкие отрезки не искажаются
+        coords = [f"{x:.3f},{y:.3f}" for x, y in points.tolist()]
+        for start, count in runs:
+            self.file.write(f'<path d="M{coords[start]}L{" ".join(coords[start + 1:start + count])}"/>\n')
+
+    def close(self):
+        self.file.write('</g>\n</svg>\n')
+        self.file.close()
+
+
+def to_pixels(segments, transform):
+    """Отрезки модели в координаты картинки"""
+    pixels = segments * transform.m11()
+    pixels[:, 0::2] += transform.dx()
+    pixels[:, 1::2] += transform.dy()
+    return pixels
+
+
+def split_by_band(segments, band_height, bands, pad):
+    """Пары (полоса, отрезки); отрезок на границе попадает в обе полосы"""
+    low = np.minimum(segments[:, 1], segments[:, 3]) - pad
+    high = np.maximum(segments[:, 1], segments[:, 3]) + pad
+    first = np.clip(np.floor(low / band_height).astype(np.int64), 0, bands - 1)
+    last = np.clip(np.floor(high / band_height).astype(np.int64), 0, bands - 1)
+    counts = last - first + 1
+    rows = np.repeat(np.arange(len(segments)), counts)
+    starts = np.repeat(np.cumsum(counts) - counts, counts)
+    band = np.repeat(first, counts) + np.arange(len(rows)) - starts
+
+    order = np.argsort(band, kind='stable')
+    band, rows = band[order], rows[order]
+    edges = np.flatnonzero(np.diff(band)) + 1
+    for part in np.split(np.arange(len(band)), edges):
+        if len(part):
+            yield int(band[part[0]]), segments[rows[part]]
+
+
+def render_png(segment_batches, path, width, height, pen_width, band_height=BAND_HEIGHT):
+    bands = -(-height // band_height)
+    with tempfile.TemporaryDirectory() as spill:
+        files = [open(Path(spill) / f"{index}.bin", 'wb') for index in range(bands)]
+        for segments in segment_batches:
+            for band, part in split_by_band(segments, band_height, bands, pen_width):
+                files[band].write(part.tobytes())
+        for f in files:
+            f.close()
+
+        writer = PngWriter(path, width, height)
+        image = QImage(width, band_height, QImage.Format_RGB32)
+        pen = QPen(Qt.black, pen_width)
+        for index in range(bands):
+            top = index * band_height
+            rows = min(band_height, height - top)
+            image.fill(Qt.white)
+            segments = np.fromfile(Path(spill) / f"{index}.bin").reshape(-1, 4)
+            if len(segments):
+                painter = QPainter(image)
+                painter.setRenderHint(QPainter.Antialiasing)
+                painter.translate(0, -top)
+                painter.setPen(pen)
+                draw_segments(painter, segments)
+                painter.end()
+
+            gray = image.convertToFormat(QImage.Format_Grayscale8)
+            buffer = gray.constBits()
+            buffer.setsize(gray.byteCount())
+            pixels = np.frombuffer(buffer, dtype=np.uint8).reshape(band_height, gray.bytesPerLine())
+            writer.write_rows(pixels[:rows, :width])
+        writer.close()
+
+
+def render_svg(segment_batches, path, width, height, pen_width):
+    writer = SvgWriter(path, width, height, pen_width)
+    for segments in segment_batches:
+        writer.write_segments(segments)
+    writer.close()
+
+
+def main(argv=None):
+    global _app
+    parser = argparse.ArgumentParser(description="Рендер L-системы в PNG или SVG без окна")
+    parser.add_argument("system", help="файл L-системы в формате LSystemApp")
+    parser.add_argument("steps", type=int, help="номер поколения")
+    parser.add_argument("output", help="выходной файл .png или .svg")
+    parser.add_argument("--size", type=int, default=4000, help="ширина в пикселях")
+    parser.add_argument("--height", type=int, help="высота в пикселях (по умолчанию = ширине)")
+    parser.add_argument("--pen", type=float, default=1.0, help="толщина линии в пикселях")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="процессов для разворачивания больших поколений")
+    args = parser.parse_args(argv)
+
+    output = Path(args.output)
+    if output.suffix.lower() not in ('.png', '.svg'):
+        parser.error("Поддерживаются только .png и .svg")
+    width, height = args.size, args.height or args.size
+
+    _app = QGuiApplication(sys.argv[:1])
+    name, angle_divisions, axiom, rules, options = read_lsystem(args.system)
+    expander = LSystemExpander(axiom, rules, **options)
+
+    with tempfile.TemporaryDirectory() as work:
+        started = time.perf_counter()
+        huge = expander.predict_lengths(args.steps)[-1] > MATERIALIZE_LIMIT
+        if not (huge and expander.context_free):
+            sequence = expander.expand(args.steps)
+            length = len(sequence)
+            chunks = lambda: [sequence]
+        else:
+            generation = expand_to_file(expander, args.steps, Path(work) / "generation.bin", args.workers)
+            length = len(generation)
+            chunks = generation.chunks
+        expanded = time.perf_counter()
+
+        bounds = None
+        for segments in iter_turtle_segments(chunks(), angle_divisions, 1.0):
+            bounds = merge_bounds(bounds, segment_bounds(segments))
+        measured = time.perf_counter()
+        if bounds is None:
+            print("В поколении нет отрезков для рисования")
+            return 1
+
+        transform = fit_transform(bounds, width, height)
+        batches = (
+            to_pixels(segments, transform)
+            for segments in iter_turtle_segments(chunks(), angle_divisions, 1.0)
+        )
+        if output.suffix.lower() == '.png':
+            # Растру детали мельче полупикселя не нужны
+            render_png((simplify_segments(part, 1.0) for part in batches),
+                       output, width, height, args.pen)
+        else:
+            # SVG увеличивают, поэтому в него идёт вся геометрия без упрощения
+            render_svg(batches, output, width, height, args.pen)
+        rendered = time.perf_counter()
+
+    print(f"{name}, шаг {args.steps}: {length} символов, {width}x{height} -> {output}")
+    print(f"Разворачивание: {expanded - started:.2f} с")
+    print(f"Рамка: {measured - expanded:.2f} с")
+    print(f"Отрисовка и запись: {rendered - measured:.2f} с "
+          f"({output.stat().st_size / 2**20:.1f} МБ)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,218 @@
+# render_worker.py
+import time
+import threading
+import numpy as np
+from PyQt5.QtCore import QThread, Qt, pyqtSignal
+from PyQt5.QtGui import QImage, QPainter, QPen
+
+from lsystem import GenerationCache, LazyExpansion, MATERIALIZE_LIMIT, sequence_bytes
+from turtle_geometry import (
+    BATCH, TurtleGeometry, iter_turtle_segments, segment_bounds, merge_bounds, simplify_segments,
+)
+from segment_painter import draw_segments, fit_transform
+from tile_view import render_tile
+
+# Как часто показывать промежуточный кадр, в секундах
+FRAME_INTERVAL = 0.1
+# Сколько отрезков рисуется между проверками отмены
+DRAW_SLICE = 100_000
+
+
+class RenderCancelled(Exception):
+    pass
+
+
+class FractalScene:
+    """Всё, что нужно для отрисовки шагов одной L-системы.
+
+    Сцена создаётся при загрузке файла, а дальше ею пользуется только поток
+    отрисовки, поэтому кэшу поколений не нужны блокировки.
+    """
+
+    def __init__(self, expander, angle_divisions, max_steps):
+        self.expander = expander
+        self.angle_divisions = angle_divisions
+        self.generation_cache = GenerationCache(expander)
+        self.lazy_expansion = LazyExpansion(expander.axiom, expander.rules)
+        self.lazy_step_bounds = {}
+        self.lengths = expander.predict_lengths(max_steps)
+
+    def is_lazy(self, step):
+        """Слишком длинные поколения не держим в памяти целиком"""
+        return self.lengths[step] > MATERIALIZE_LIMIT
+
+    def batches(self, chunks, step, report, start, share):
+        """Пакеты отрезков с отчётом о доле обработанных символов"""
+        length = max(self.lengths[step], 1)
+        for index, segments in enumerate(iter_turtle_segments(chunks, self.angle_divisions, 1.0)):
+            report(start + share * min((index + 1) * BATCH / length, 1.0))
+            yield segments
+
+    def geometry(self, step, report):
+        """Геометрия шага в координатах модели из кэша поколений"""
+        def build(sequence):
+            parts = list(self.batches([sequence], step, report, 0.4, 0.3))
+            return TurtleGeometry(np.concatenate(parts) if parts else np.empty((0, 4)))
+
+        self.generation_cache.sequence(
+            step, lambda done, total: report(0.4 * done / total)
+        )
+        return self.generation_cache.geometry(step, build)
+
+    def lazy_bounds(self, step, report):
+        """Рамка ленивого шага: отдельный проход, результат запоминается"""
+        if step not in self.lazy_step_bounds:
+            bounds = None
+            chunks = self.lazy_expansion.chunks(step)
+            for segments in self.batches(chunks, step, report, 0.0, 0.5):
+                bounds = merge_bounds(bounds, segment_bounds(segments))
+            self.lazy_step_bounds[step] = bounds
+        return self.lazy_step_bounds[step]
+
+    def describe(self, step, elapsed):
+        """Строка состояния после отрисовки шага"""
+        if self.is_lazy(step):
+            return (f"Шаг {step}: {self.lengths[step]} символов, "
+                    f"ленивое развёртывание, {elapsed:.2f} с")
+        cache = self.generation_cache
+        generation = cache.generations[step]
+        if cache.last_rewrites:
+            expansion = (f"перезапись {generation.rewrite_seconds * 1000:.1f} мс "
+                         f"(шагов: {cache.last_rewrites})")
+        else:
+            expansion = "из кэша"
+        return (f"Шаг {step}: {len(generation.sequence)} символов, "
+                f"{sequence_bytes(generation.sequence) / 2**20:.1f} МБ, {expansion}, "
+                f"всего {elapsed:.2f} с; кэш {cache.nbytes() / 2**20:.0f} МБ")
+
+
+class RenderWorker(QThread):
+    """Поток, который разворачивает и рисует шаги L-системы в QImage.
+
+    Новый запрос отменяет текущий: работа прерывается на ближайшей проверке
+    между перезаписями, пакетами черепахи, порциями отрезков или плитками.
+    Пока идёт отрисовка, раз в FRAME_INTERVAL публикуется промежуточный кадр.
+    """
+
+    frame_ready = pyqtSignal(int, QImage)
+    progress = pyqtSignal(int, float, float)  # задание, доля, секунды
+    finished_job = pyqtSignal(int, str)
+    geometry_ready = pyqtSignal(int, object)  # задание, TurtleGeometry с индексом
+    tile_ready = pyqtSignal(int, object, QImage)  # задание, (уровень, x, y), плитка
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.condition = threading.Condition()
+        self.pending = None
+        self.stopping = False
+        self.job_id = 0
+
+    def request(self, scene, step, width, height, ratio):
+        """Ставит отрисовку шага в очередь вместо текущей; возвращает номер задания"""
+        with self.condition:
+            self.job_id += 1
+            self.pending = (self.render, (self.job_id, scene, step, width, height, ratio))
+            self.condition.notify()
+            return self.job_id
+
+    def request_tiles(self, geometry, scale, keys):
+        """Ставит отрисовку плиток увеличенного вида вместо текущей работы"""
+        with self.condition:
+            self.job_id += 1
+            self.pending = (self.render_tiles, (self.job_id, geometry, scale, keys))
+            self.condition.notify()
+            return self.job_id
+
+    def stop(self):
+        with self.condition:
+            self.stopping = True
+            self.condition.notify()
+        self.wait()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.pending is None and not self.stopping:
+                    self.condition.wait()
+                if self.stopping:
+                    return
+                work, args = self.pending
+                self.pending = None
+            try:
+                work(*args)
+            except RenderCancelled:
+                pass
+
+    def render(self, job_id, scene, step, width, height, ratio):
+        started = time.perf_counter()
+
+        def report(share):
+            if self.pending is not None or self.stopping:
+                raise RenderCancelled
+            self.progress.emit(job_id, share, time.perf_counter() - started)
+
+        image = QImage(round(width * ratio), round(height * ratio),
+                       QImage.Format_ARGB32_Premultiplied)
+        image.setDevicePixelRatio(ratio)
+        image.fill(Qt.white)
+
+        if scene.is_lazy(step):
+            bounds = scene.lazy_bounds(step, report)
+            draw_start = 0.5
+        else:
+            geometry = scene.geometry(step, report)
+            bounds = geometry.bounds
+            draw_start = 0.7
+
+        if bounds is not None:
+            transform = fit_transform(bounds, width, height)
+            # Упрощение считается в пикселях устройства
+            scale = transform.m11() * ratio
+            if scene.is_lazy(step):
+                # Отрезки идут прямо из обхода в глубину, ничего не накапливается
+                chunks = scene.lazy_expansion.chunks(step)
+                parts = (simplify_segments(segments, scale) for segments in
+                         scene.batches(chunks, step, report, draw_start, 1 - draw_start))
+            else:
+                parts = self.slices(geometry.simplified(scale), report, draw_start)
+            self.paint(job_id, image, transform, parts)
+
+        self.frame_ready.emit(job_id, image)
+        if not scene.is_lazy(step):
+            # Индекс для масштабирования строится здесь, а не в потоке окна
+            geometry.index()
+            self.geometry_ready.emit(job_id, geometry)
+        self.finished_job.emit(job_id, scene.describe(step, time.perf_counter() - started))
+
+    def render_tiles(self, job_id, geometry, scale, keys):
+        """Плитки по одной: каждая уходит в окно, как только готова"""
+        for key in keys:
+            if self.pending is not None or self.stopping:
+                raise RenderCancelled
+            _, tx, ty = key
+            self.tile_ready.emit(job_id, key, render_tile(geometry, scale, tx, ty))
+
+    def slices(self, segments, report, start):
+        """Порции готовых отрезков с отчётом о прогрессе"""
+        for first in range(0, len(segments), DRAW_SLICE):
+            yield segments[first:first + DRAW_SLICE]
+            report(start + (1 - start) * min(first + DRAW_SLICE, len(segments)) / len(segments))
+
+    def paint(self, job_id, image, transform, parts):
+        painter = QPainter(image)
+        try:
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.setTransform(transform)
+            # Толщина линии в пикселях, а не в единицах модели
+            pen = QPen(Qt.black, 1)
+            pen.setCosmetic(True)
+            painter.setPen(pen)
+
+            published = time.perf_counter()
+            for segments in parts:
+                draw_segments(painter, segments)
+                if time.perf_counter() - published > FRAME_INTERVAL:
+                    self.frame_ready.emit(job_id, image.copy())
+                    published = time.perf_counter()
+        finally:
+            painter.end()
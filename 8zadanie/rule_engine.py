@@ -0,0 +1,249 @@
+# rule_engine.py
+from collections import Counter
+import numpy as np
+
+
+class Rule:
+    """Правило 'левый<символ>правый:вес преемник'; контексты и вес необязательны"""
+
+    def __init__(self, predecessor, successor, left='', right='', weight=None):
+        self.predecessor = predecessor
+        self.successor = successor
+        self.left = left
+        self.right = right
+        self.weight = weight
+
+    @property
+    def is_simple(self):
+        """Обычное правило: один символ, без контекста и без веса"""
+        return (len(self.predecessor) == 1 and not self.left and not self.right
+                and self.weight is None)
+
+
+def parse_rule(spec, successor):
+    """Разбирает левую часть правила: 'A<B>C:0.5', 'AB', 'F:2', 'F'"""
+    weight = None
+    head, colon, tail = spec.rpartition(':')
+    if colon and head:
+        try:
+            weight = float(tail)
+        except ValueError:
+            pass
+        else:
+            if weight <= 0:
+                raise ValueError(f"Вес правила должен быть положительным: '{spec}'")
+            spec = head
+
+    left, right = '', ''
+    if '<' in spec[1:]:
+        left, spec = spec.split('<', 1)
+    if '>' in spec[:-1]:
+        spec, right = spec.split('>', 1)
+    if not spec:
+        raise ValueError("Пустая левая часть правила")
+    return Rule(spec, successor, left, right, weight)
+
+
+def parse_rules(pairs):
+    """Правила из пар (левая часть, преемник) в порядке файла.
+
+    Повтор одной и той же левой части без веса заменяет прежнее правило,
+    как это было со словарём правил.
+    """
+    rules = []
+    for spec, successor in pairs:
+        rule = parse_rule(spec, successor)
+        if rule.weight is None:
+            rules = [
+                old for old in rules
+                if (old.predecessor, old.left, old.right, old.weight) !=
+                   (rule.predecessor, rule.left, rule.right, None)
+            ]
+        rules.append(rule)
+    return rules
+
+
+def simple_rules(rules):
+    """Словарь {символ: преемник}, если все правила обычные, иначе None"""
+    if all(rule.is_simple for rule in rules):
+        return {rule.predecessor: rule.successor for rule in rules}
+    return None
+
+
+class _Group:
+    """Альтернативы для одного символа с одинаковым контекстом"""
+
+    def __init__(self, left, right, order):
+        self.left = left
+        self.right = right
+        self.order = order
+        self.successors = []
+        self.weights = []
+        self.marks = None
+        self.cumulative = None
+
+    @property
+    def specificity(self):
+        return len(self.left) + len(self.right)
+
+
+class CompiledRules:
+    """Набор правил, скомпилированный в таблицу замен и маски numpy.
+
+    Перезапись идёт в три прохода на C/numpy:
+    1. многосимвольные левые части заменяются через str.replace на свои
+       служебные символы - от длинных к коротким, затем в порядке файла,
+       без перекрытий слева направо;
+    2. для односимвольных правил байты строки один раз прогоняются через
+       таблицу 256 -> служебный символ; контекстные и стохастические
+       правила выбираются масками по позициям символа;
+    3. служебные символы заменяются на преемников через str.replace.
+
+    Служебные символы - коды 1..255, которых нет в алфавите, поэтому
+    символы L-системы должны помещаться в latin-1. Контекст - ближайшие
+    соседи, не входящие в ignore; совпавший многосимвольный фрагмент для
+    соседей выглядит одним символом. Стохастический выбор зависит только
+    от seed и номера шага, поэтому повторяется от запуска к запуску.
+    """
+
+    def __init__(self, rules, alphabet, seed=0, ignore=''):
+        self.seed = seed
+        symbols = set(alphabet) | set(ignore)
+        for rule in rules:
+            symbols |= set(rule.predecessor + rule.successor + rule.left + rule.right)
+        if any(ord(char) > 255 for char in symbols):
+            raise ValueError("Символы L-системы со сложными правилами должны быть в latin-1")
+        free = iter(chr(code) for code in range(1, 256) if chr(code) not in symbols)
+
+        def mark():
+            try:
+                return next(free)
+            except StopIteration:
+                raise ValueError("Слишком много правил: не хватает служебных символов") from None
+
+        self.replacements = []
+        self.multi = []
+        multi_rules = [rule for rule in rules if len(rule.predecessor) > 1]
+        for rule in multi_rules:
+            if rule.left or rule.right or rule.weight is not None:
+                raise ValueError(
+                    f"Контекст и вес поддерживаются только для одного символа: '{rule.predecessor}'"
+                )
+        for order, rule in sorted(enumerate(multi_rules), key=lambda item: (-len(item[1].predecessor), item[0])):
+            symbol = mark()
+            self.multi.append((rule.predecessor, symbol))
+            self.replacements.append((symbol, rule.successor))
+
+        self.table = np.arange(256, dtype=np.uint8)
+        self.groups = {}
+        single = [rule for rule in rules if len(rule.predecessor) == 1]
+        for order, rule in enumerate(single):
+            code = ord(rule.predecessor)
+            if rule.is_simple and not any(
+                other.predecessor == rule.predecessor and not other.is_simple for other in single
+            ):
+                if rule.successor != rule.predecessor:
+                    symbol = mark()
+                    self.table[code] = ord(symbol)
+                    self.replacements.append((symbol, rule.successor))
+                continue
+            groups = self.groups.setdefault(code, {})
+            group = groups.setdefault((rule.left, rule.right), _Group(rule.left, rule.right, order))
+            group.successors.append(rule.successor)
+            group.weights.append(1.0 if rule.weight is None else rule.weight)
+
+        for code, groups in self.groups.items():
+            ordered = sorted(groups.values(), key=lambda group: (-group.specificity, group.order))
+            for group in ordered:
+                marks = []
+                for successor in group.successors:
+                    if successor == chr(code):
+                        marks.append(code)
+                    else:
+                        symbol = mark()
+                        marks.append(ord(symbol))
+                        self.replacements.append((symbol, successor))
+                group.marks = np.array(marks, dtype=np.uint8)
+                weights = np.array(group.weights)
+                group.cumulative = np.cumsum(weights) / weights.sum()
+            self.groups[code] = ordered
+
+        self.ignored = np.zeros(256, dtype=bool)
+        self.ignored[[ord(char) for char in ignore]] = True
+        self.uses_context = any(
+            group.left or group.right for groups in self.groups.values() for group in groups
+        )
+        self.growth = self.growth_bound(rules, symbols)
+
+    @staticmethod
+    def growth_bound(rules, symbols):
+        """Оценка сверху того, во что переходит каждый символ за шаг.
+
+        Символ сам остаётся в оценке, только если он может уцелеть: у него
+        нет правила без контекста. Иначе для 'A -> B' оценка была бы
+        {A: 1, B: 1} и удваивалась бы на каждом шаге.
+        """
+        growth = {char: Counter(char) for char in symbols}
+        for rule in rules:
+            if len(rule.predecessor) == 1 and not rule.left and not rule.right:
+                growth[rule.predecessor] = Counter()
+        for rule in rules:
+            first = rule.predecessor[0]
+            produced = Counter(rule.successor)
+            bound = growth[first]
+            for char, amount in produced.items():
+                bound[char] = max(bound[char], amount)
+        return growth
+
+    def neighbours(self, codes):
+        """Индексы ближайшего слева и справа не игнорируемого символа (-1 - нет)"""
+        positions = np.arange(len(codes))
+        kept = ~self.ignored[codes]
+        before = np.maximum.accumulate(np.where(kept, positions, -1))
+        previous = np.concatenate(([-1], before[:-1]))
+        after = np.minimum.accumulate(np.where(kept, positions, len(codes))[::-1])[::-1]
+        following = np.concatenate((after[1:], [len(codes)]))
+        following[following == len(codes)] = -1
+        return previous, following
+
+    @staticmethod
+    def context_matches(codes, positions, links, context):
+        """Совпадает ли цепочка соседей по links с context (ближний сосед - первым)"""
+        matches = np.ones(len(positions), dtype=bool)
+        current = positions
+        for char in context:
+            current = np.where(current >= 0, links[np.maximum(current, 0)], -1)
+            matches &= (current >= 0) & (codes[np.maximum(current, 0)] == ord(char))
+        return matches
+
+    def rewrite(self, sequence, step):
+        for predecessor, symbol in self.multi:
+            sequence = sequence.replace(predecessor, symbol)
+
+        codes = np.frombuffer(sequence.encode('latin-1'), dtype=np.uint8)
+        out = self.table[codes]
+        if self.groups:
+            random = np.random.default_rng([self.seed, step])
+            if self.uses_context:
+                previous, following = self.neighbours(codes)
+            for code, groups in self.groups.items():
+                positions = np.flatnonzero(codes == code)
+                undecided = np.ones(len(positions), dtype=bool)
+                for group in groups:
+                    matches = undecided.copy()
+                    if group.left:
+                        matches &= self.context_matches(codes, positions, previous, group.left[::-1])
+                    if group.right:
+                        matches &= self.context_matches(codes, positions, following, group.right)
+                    chosen = positions[matches]
+                    if len(group.marks) == 1:
+                        out[chosen] = group.marks[0]
+                    else:
+                        picks = np.searchsorted(group.cumulative, random.random(len(chosen)), side='right')
+                        out[chosen] = group.marks[np.minimum(picks, len(group.marks) - 1)]
+                    undecided &= ~matches
+
+        sequence = out.tobytes().decode('latin-1')
+        for symbol, successor in self.replacements:
+            sequence = sequence.replace(symbol, successor)
+        return sequence
@@ -0,0 +1,44 @@
+# segment_painter.py
+import numpy as np
+from PyQt5.QtGui import QPolygonF, QTransform
+
+from turtle_geometry import polyline_runs
+
+# Отступ от края холста при вписывании рисунка, в пикселях
+FIT_MARGIN = 10
+
+
+def to_polygon(points):
+    """QPolygonF из массива (N, 2) одним копированием памяти"""
+    points = np.ascontiguousarray(points, dtype=np.float64)
+    polygon = QPolygonF(len(points))
+    if len(points):
+        buffer = polygon.data()
+        buffer.setsize(points.nbytes)
+        np.frombuffer(buffer, dtype=np.float64)[:] = points.ravel()
+    return polygon
+
+
+def draw_segments(painter, segments):
+    """Рисует отрезки (N, 4) ломаными: по вызову на непрерывный участок"""
+    points, runs = polyline_runs(segments)
+    polygon = to_polygon(points)
+    if len(runs) == 1:
+        painter.drawPolyline(polygon)
+        return
+    for start, count in runs:
+        painter.drawPolyline(polygon.mid(start, count))
+
+
+def fit_transform(bounds, width, height, margin=FIT_MARGIN):
+    """Преобразование, вписывающее рамку модели в холст с сохранением пропорций"""
+    left, top, right, bottom = bounds
+    span_x = max(right - left, 1e-9)
+    span_y = max(bottom - top, 1e-9)
+    scale = min(max(width - 2 * margin, 1) / span_x, max(height - 2 * margin, 1) / span_y)
+
+    transform = QTransform()
+    transform.translate(width / 2, height / 2)
+    transform.scale(scale, scale)
+    transform.translate(-(left + right) / 2, -(top + bottom) / 2)
+    return transform
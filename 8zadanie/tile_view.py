@@ -0,0 +1,218 @@
+# tile_view.py
+import math
+from collections import OrderedDict
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage, QPainter, QPen, QPixmap
+
+from segment_painter import draw_segments, fit_transform
+from turtle_geometry import simplify_segments
+
+# Сторона плитки в пикселях устройства
+TILE_SIZE = 256
+# Во сколько раз меняется масштаб за один щелчок колеса
+ZOOM_STEP = math.sqrt(2)
+MAX_ZOOM_LEVEL = 40
+# Сколько плиток держать в памяти (256 КБ каждая)
+TILE_CACHE_SIZE = 256
+
+
+class TileCache:
+    """LRU готовых плиток по ключу (уровень масштаба, x, y)"""
+
+    def __init__(self, max_tiles=TILE_CACHE_SIZE):
+        self.max_tiles = max_tiles
+        self.tiles = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        tile = self.tiles.get(key)
+        if tile is None:
+            self.misses += 1
+            return None
+        self.tiles.move_to_end(key)
+        self.hits += 1
+        return tile
+
+    def put(self, key, tile):
+        self.tiles[key] = tile
+        self.tiles.move_to_end(key)
+        if len(self.tiles) > self.max_tiles:
+            self.tiles.popitem(last=False)
+
+    def clear(self):
+        self.tiles.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+def render_tile(geometry, scale, tx, ty):
+    """Плитка (tx, ty) при масштабе scale пикселей устройства на единицу модели.
+
+    Не трогает состояние вида, поэтому вызывается из потока отрисовки.
+    """
+    image = QImage(TILE_SIZE, TILE_SIZE, QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.white)
+    # С запасом в пиксель, чтобы сглаженные края линий не обрезались на стыках
+    pad = 1.5 / scale
+    segments = geometry.visible(
+        tx * TILE_SIZE / scale - pad, ty * TILE_SIZE / scale - pad,
+        (tx + 1) * TILE_SIZE / scale + pad, (ty + 1) * TILE_SIZE / scale + pad,
+    )
+    if len(segments):
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.translate(-tx * TILE_SIZE, -ty * TILE_SIZE)
+        painter.scale(scale, scale)
+        pen = QPen(Qt.black, 1)
+        pen.setCosmetic(True)
+        painter.setPen(pen)
+        draw_segments(painter, simplify_segments(segments, scale))
+        painter.end()
+    return image
+
+
+class FractalView:
+    """Масштаб и сдвиг поверх готовой геометрии шага.
+
+    Уровень 0 - рисунок целиком по размеру холста, каждый следующий
+    увеличивает в ZOOM_STEP раз. Картинка уровня делится на плитки
+    TILE_SIZE в пикселях устройства, плитка рисуется только из отрезков,
+    которые индекс геометрии нашёл в её прямоугольнике. Сам вид плитки не
+    рисует: недостающие отдаются потоку отрисовки через render_tile.
+    """
+
+    def __init__(self):
+        self.tile_cache = TileCache()
+        self.geometry = None
+        self.level = 0
+        self.center = (0.0, 0.0)
+        self.fit_scale = 1.0
+        self.ratio = 1.0
+        # Последняя собранная картинка: (QImage, масштаб, левый край, верхний край)
+        self.frame = None
+
+    @property
+    def zoomed(self):
+        return self.geometry is not None and (self.level > 0 or self.center != self.home())
+
+    def home(self):
+        left, top, right, bottom = self.geometry.bounds
+        return ((left + right) / 2, (top + bottom) / 2)
+
+    def set_geometry(self, geometry, width, height, ratio, frame=None):
+        """Новая геометрия сбрасывает вид и плитки.
+
+        frame - готовая картинка всего рисунка из потока отрисовки: она
+        становится заглушкой для плиток первого увеличения.
+        """
+        self.tile_cache.clear()
+        self.geometry = geometry if geometry is not None and geometry.bounds is not None else None
+        self.level = 0
+        self.ratio = ratio
+        self.frame = None
+        if self.geometry is not None:
+            self.center = self.home()
+            self.fit_scale = fit_transform(self.geometry.bounds, width, height).m11()
+            if frame is not None:
+                # Картинка вида живёт в пикселях устройства, без своего devicePixelRatio
+                frame = QImage(frame)
+                frame.setDevicePixelRatio(1.0)
+                scale = self.scale()
+                self.frame = (frame, scale, *self.origin(scale, frame.width(), frame.height()))
+
+    def reset(self):
+        if self.geometry is not None:
+            self.level = 0
+            self.center = self.home()
+
+    def scale(self):
+        """Пикселей устройства на единицу модели на текущем уровне"""
+        return self.fit_scale * ZOOM_STEP ** self.level * self.ratio
+
+    def zoom(self, steps, x, y, width, height):
+        """Меняет уровень на steps, оставляя точку (x, y) холста на месте"""
+        level = min(max(self.level + steps, 0), MAX_ZOOM_LEVEL)
+        if self.geometry is None or level == self.level:
+            return False
+        old = self.scale() / self.ratio
+        self.level = level
+        new = self.scale() / self.ratio
+        dx, dy = x - width / 2, y - height / 2
+        cx, cy = self.center
+        self.center = (cx + dx / old - dx / new, cy + dy / old - dy / new)
+        if level == 0:
+            self.center = self.home()
+        return True
+
+    def pan(self, dx, dy):
+        """Сдвигает вид на (dx, dy) пикселей холста"""
+        if self.geometry is None or self.level == 0:
+            return False
+        scale = self.scale() / self.ratio
+        cx, cy = self.center
+        self.center = (cx - dx / scale, cy - dy / scale)
+        return True
+
+    def origin(self, scale, pixel_width, pixel_height):
+        """Левый верхний угол вида в пикселях устройства уровня"""
+        return (self.center[0] * scale - pixel_width / 2,
+                self.center[1] * scale - pixel_height / 2)
+
+    def compose(self, width, height):
+        """Картинка вида под холст и список плиток, которых нет в кэше.
+
+        Вместо недостающих плиток видна растянутая прошлая картинка; плитки
+        дорисовываются в неё через add_tile, когда их пришлёт поток отрисовки.
+        """
+        scale = self.scale()
+        pixel_width, pixel_height = round(width * self.ratio), round(height * self.ratio)
+        left, top = self.origin(scale, pixel_width, pixel_height)
+
+        image = QImage(pixel_width, pixel_height, QImage.Format_ARGB32_Premultiplied)
+        image.fill(Qt.white)
+        painter = QPainter(image)
+        if self.frame is not None:
+            old_image, old_scale, old_left, old_top = self.frame
+            factor = scale / old_scale
+            painter.setRenderHint(QPainter.SmoothPixmapTransform)
+            painter.translate(old_left * factor - left, old_top * factor - top)
+            painter.scale(factor, factor)
+            painter.drawImage(0, 0, old_image)
+            painter.resetTransform()
+
+        missing = []
+        for ty in range(math.floor(top / TILE_SIZE), math.floor((top + pixel_height) / TILE_SIZE) + 1):
+            for tx in range(math.floor(left / TILE_SIZE), math.floor((left + pixel_width) / TILE_SIZE) + 1):
+                key = (self.level, tx, ty)
+                tile = self.tile_cache.get(key)
+                if tile is None:
+                    missing.append(key)
+                else:
+                    painter.drawImage(round(tx * TILE_SIZE - left), round(ty * TILE_SIZE - top), tile)
+        painter.end()
+
+        self.frame = (image, scale, left, top)
+        return self.pixmap(), missing
+
+    def add_tile(self, key, tile):
+        """Кладёт плитку в кэш и дорисовывает её в картинку, если она в виде"""
+        self.tile_cache.put(key, tile)
+        level, tx, ty = key
+        if self.frame is None or level != self.level:
+            return False
+        image, _, left, top = self.frame
+        painter = QPainter(image)
+        painter.drawImage(round(tx * TILE_SIZE - left), round(ty * TILE_SIZE - top), tile)
+        painter.end()
+        return True
+
+    def pixmap(self):
+        pixmap = QPixmap.fromImage(self.frame[0])
+        pixmap.setDevicePixelRatio(self.ratio)
+        return pixmap
+
+    def describe(self):
+        cache = self.tile_cache
+        return (f"Масштаб ×{ZOOM_STEP ** self.level:.1f}; "
+                f"плиток в кэше {len(cache.tiles)}, попаданий {cache.hits} из {cache.hits + cache.misses}")
@@ -0,0 +1,419 @@
+# turtle_geometry.py
+import numpy as np
+
+# Символы, которые двигают черепаху: с рисованием и без
+DRAW = 'FAB'
+MOVE = 'f'
+
+# Сколько символов обрабатывается одним векторным проходом
+BATCH = 1 << 19
+
+# Размер клетки упрощения для отрисовки, в пикселях
+LOD_CELL = 0.5
+
+# Сетка пространственного индекса: не больше клеток по стороне
+# и примерно столько отрезков на клетку
+GRID_MAX_CELLS = 256
+GRID_SEGMENTS_PER_CELL = 8
+
+_OPEN, _CLOSE = ord('['), ord(']')
+
+# Таблицы по коду символа: рисует ли, длина шага в единицах, поворот
+_DRAWS = np.zeros(256, dtype=bool)
+_DRAWS[[ord(char) for char in DRAW]] = True
+_STEPS = np.zeros(256)
+_STEPS[[ord(char) for char in DRAW + MOVE]] = 1.0
+_TURNS = np.zeros(256, dtype=np.int64)
+_TURNS[ord('+')] = 1
+_TURNS[ord('-')] = -1
+
+
+class TurtleState:
+    """Положение черепахи и стек '[' между кусками последовательности"""
+
+    def __init__(self):
+        self.x = 0.0
+        self.y = 0.0
+        self.direction = 0  # номер направления из angle_divisions
+        self.stack = []     # [(x, y, direction)]
+
+
+def _codes(text):
+    """Байты последовательности; символы вне latin-1 становятся '?' и ничего не делают"""
+    return np.frombuffer(text.encode('latin-1', 'replace'), dtype=np.uint8)
+
+
+def _resolve(pred, value):
+    """Сумма value по цепочке pred до корня (pred < 0) удвоением указателей"""
+    pred = pred.copy()
+    value = value.copy()
+    active = np.flatnonzero(pred >= 0)
+    while len(active):
+        parent = pred[active]
+        value[active] += value[parent]
+        pred[active] = pred[parent]
+        active = active[pred[active] >= 0]
+    return value
+
+
+class _Brackets:
+    """Разбор скобок куска: кто кого восстанавливает.
+
+    Каждая скобка - узел дерева. '[' и ']' без пары в стеке ссылаются на
+    предыдущую скобку и добавляют накопленное с неё приращение; ']' с парой
+    ссылается на свою '[' без приращения, то есть восстанавливает её
+    состояние; ']', снимающая состояние из стека прошлых кусков, - корень
+    с известным значением. Значение в любом символе - значение последней
+    скобки до него плюс приращения после неё.
+    """
+
+    def __init__(self, codes, carried):
+        opens = codes == _OPEN
+        closes = codes == _CLOSE
+        change = opens.astype(np.int64) - closes
+        raw = np.cumsum(change)
+        # Глубина не опускается ниже нуля: лишние ']' снимают со стека прошлых кусков
+        depth = raw - np.minimum(np.minimum.accumulate(raw), 0)
+        depth_before = np.concatenate(([0], depth[:-1]))
+
+        self.events = np.flatnonzero(opens | closes)
+        count = len(self.events)
+        is_open = opens[self.events]
+        level = np.where(is_open, depth[self.events], depth_before[self.events])
+        # Пары скобок одного уровня идут подряд после устойчивой сортировки
+        order = np.argsort(level, kind='stable')
+        sorted_level = level[order]
+        sorted_open = is_open[order]
+
+        self.pred = np.arange(-1, count - 1)
+        self.restores = np.zeros(count, dtype=bool)
+        paired = np.flatnonzero(~sorted_open[1:] & (sorted_level[1:] > 0)) + 1
+        self.pred[order[paired]] = order[paired - 1]
+        self.restores[order[paired]] = True
+
+        matched_open = np.zeros(count, dtype=bool)
+        matched_open[order[paired - 1]] = True
+        self.unmatched_opens = np.flatnonzero(is_open & ~matched_open)
+
+        # ']' сверх своих '[' по порядку снимают состояния со стека прошлых кусков
+        extra = np.flatnonzero(~is_open & (level == 0))
+        self.popped = min(len(extra), carried)
+        self.roots = extra[:self.popped]
+        self.pred[self.roots] = -1
+
+        # Для каждого символа - номер последней скобки не позже него
+        marks = np.zeros(len(codes), dtype=np.int64)
+        marks[self.events] = 1
+        self.last_event = np.cumsum(marks) - 1
+
+    def scan(self, increments, start, stacked):
+        """Накопленное значение после каждого символа с учётом восстановлений.
+
+        increments - приращения по символам, start - значение до
+        куска, stacked - значения для ']' из стека прошлых кусков.
+        """
+        total = np.cumsum(increments) + start
+        if not len(self.events):
+            return total
+
+        at_events = total[self.events]
+        value = np.empty_like(at_events)
+        value[0] = at_events[0]
+        value[1:] = at_events[1:] - at_events[:-1]
+        value[self.restores] = 0
+        value[self.roots] = stacked
+        resolved = _resolve(self.pred, value)
+
+        last = self.last_event
+        after = last >= 0
+        shift = resolved - at_events
+        total[after] += shift[last[after]]
+        return total
+
+
+def _walk(codes, state, cos_table, sin_table, length):
+    """Отрезки одного куска массивом (N, 4); state обновляется на месте"""
+    brackets = _Brackets(codes, len(state.stack))
+    stacked = state.stack[len(state.stack) - brackets.popped:][::-1]
+    divisions = len(cos_table)
+
+    directions = brackets.scan(
+        _TURNS[codes], state.direction,
+        np.array([direction for _, _, direction in stacked], dtype=np.int64)
+    ) % divisions
+
+    steps = _STEPS[codes] * length
+    xs = brackets.scan(cos_table[directions] * steps, state.x,
+                       np.array([x for x, _, _ in stacked], dtype=np.float64))
+    ys = brackets.scan(sin_table[directions] * steps, state.y,
+                       np.array([y for _, y, _ in stacked], dtype=np.float64))
+
+    drawing = np.flatnonzero(_DRAWS[codes])
+    before = np.maximum(drawing - 1, 0)
+    segments = np.empty((len(drawing), 4))
+    segments[:, 0] = xs[before]
+    segments[:, 1] = ys[before]
+    segments[:, 2] = xs[drawing]
+    segments[:, 3] = ys[drawing]
+    if len(drawing) and drawing[0] == 0:
+        segments[0, :2] = state.x, state.y
+
+    if brackets.popped:
+        del state.stack[len(state.stack) - brackets.popped:]
+    for index in brackets.events[brackets.unmatched_opens]:
+        state.stack.append((float(xs[index]), float(ys[index]), int(directions[index])))
+    state.x, state.y = float(xs[-1]), float(ys[-1])
+    state.direction = int(directions[-1])
+    return segments
+
+
+def direction_table(angle_divisions):
+    """Косинусы и синусы всех angle_divisions направлений"""
+    angles = np.arange(angle_divisions) * (2 * np.pi / angle_divisions)
+    return np.cos(angles), np.sin(angles)
+
+
+def iter_turtle_segments(chunks, angle_divisions, length, batch=BATCH):
+    """Генератор массивов отрезков (N, 4) по потоку кусков последовательности.
+
+    Мелкие куски склеиваются до batch символов, каждый пакет считается
+    векторно: направления и координаты - накопленными суммами, а '[' / ']'
+    - восстановлением значения у парной скобки. Состояние черепахи и стек
+    переходят между пакетами.
+    """
+    cos_table, sin_table = direction_table(angle_divisions)
+    state = TurtleState()
+    pending = []
+    size = 0
+
+    def flush():
+        codes = _codes(''.join(pending))
+        pending.clear()
+        return _walk(codes, state, cos_table, sin_table, length)
+
+    for chunk in chunks:
+        offset = 0
+        while offset < len(chunk):
+            piece = chunk[offset:offset + batch - size]
+            offset += len(piece)
+            pending.append(piece)
+            size += len(piece)
+            if size >= batch:
+                yield flush()
+                size = 0
+    if size:
+        yield flush()
+
+
+def polyline_runs(segments):
+    """Точки ломаных и границы непрерывных участков.
+
+    Соседние отрезки черепахи обычно стыкуются, поэтому вместо пары точек
+    на отрезок храним одну; разрыв - там, где начало отрезка не совпадает
+    с концом предыдущего (после ']' или 'f').
+    """
+    if not len(segments):
+        return np.empty((0, 2)), []
+    breaks = np.flatnonzero(
+        (segments[1:, 0] != segments[:-1, 2]) | (segments[1:, 1] != segments[:-1, 3])
+    ) + 1
+    starts = np.concatenate(([0], breaks))
+    ends = np.concatenate((breaks, [len(segments)]))
+
+    # Участок i занимает точки starts[i] + i .. ends[i] + i включительно
+    points = np.empty((len(segments) + len(starts), 2))
+    run_of_segment = np.repeat(np.arange(len(starts)), ends - starts)
+    index = np.arange(len(segments)) + run_of_segment
+    points[index] = segments[:, :2]
+    points[ends + np.arange(len(starts))] = segments[ends - 1, 2:]
+    runs = list(zip((starts + np.arange(len(starts))).tolist(), (ends - starts + 1).tolist()))
+    return points, runs
+
+
+
+def simplify_segments(segments, scale, cell=LOD_CELL):
+    """Упрощение для отрисовки в масштабе scale пикселей на единицу модели.
+
+    Плоскость делится на клетки по cell пикселей. В каждой ломаной из
+    подряд идущих точек одной клетки остаётся первая, а затем из отрезков
+    с одинаковой парой клеток - первый. Отклонение не больше клетки, а
+    число отрезков ограничено числом пар соседних клеток, то есть площадью
+    холста, а не длиной поколения.
+    """
+    if len(segments) < 2:
+        return segments
+    size = cell / scale
+    # Отрезков меньше, чем клеток под рисунком: рисовать их и так недолго
+    left, top, right, bottom = segment_bounds(segments)
+    if len(segments) < ((right - left) / size + 1) * ((bottom - top) / size + 1):
+        return segments
+
+    points, runs = polyline_runs(segments)
+    cell_x = np.floor(points[:, 0] / size).astype(np.int64)
+    cell_y = np.floor(points[:, 1] / size).astype(np.int64)
+    run_starts = np.array([start for start, _ in runs])
+    run_lengths = np.array([count for _, count in runs])
+    run_of_point = np.repeat(np.arange(len(runs)), run_lengths)
+
+    keep = np.ones(len(points), dtype=bool)
+    keep[1:] = (cell_x[1:] != cell_x[:-1]) | (cell_y[1:] != cell_y[:-1])
+    keep[run_starts] = True
+    keep[run_starts + run_lengths - 1] = True
+
+    kept = np.flatnonzero(keep)
+    joined = run_of_point[kept[1:]] == run_of_point[kept[:-1]]
+    first, second = kept[:-1][joined], kept[1:][joined]
+
+    # Отрезок и его обратный - одна и та же пара клеток
+    cell_x = cell_x[kept] - cell_x[kept].min()
+    cell_y = cell_y[kept] - cell_y[kept].min()
+    position = np.empty(len(points), dtype=np.int64)
+    position[kept] = np.arange(len(kept))
+    first_at, second_at = position[first], position[second]
+    span_y = int(cell_y.max()) + 1
+    total = (int(cell_x.max()) + 1) * span_y
+    if total * total < 2 ** 63:
+        # Номер клетки - одно число, пара клеток - одно int64
+        ids = cell_x * span_y + cell_y
+        low = np.minimum(ids[first_at], ids[second_at])
+        high = np.maximum(ids[first_at], ids[second_at])
+        keys = low * total + high
+    else:
+        pairs = np.stack((cell_x[first_at], cell_y[first_at],
+                          cell_x[second_at], cell_y[second_at]), axis=1)
+        swap = (pairs[:, 0] > pairs[:, 2]) | ((pairs[:, 0] == pairs[:, 2]) & (pairs[:, 1] > pairs[:, 3]))
+        pairs[swap] = pairs[swap][:, [2, 3, 0, 1]]
+        keys = pairs.view(np.dtype((np.void, pairs.dtype.itemsize * 4))).ravel()
+    _, unique = np.unique(keys, return_index=True)
+    unique.sort()
+
+    simplified = np.empty((len(unique), 4))
+    simplified[:, :2] = points[first[unique]]
+    simplified[:, 2:] = points[second[unique]]
+    return simplified
+
+
+def segment_bounds(segments):
+    """Рамка отрезков (left, top, right, bottom) или None, если отрезков нет"""
+    if not len(segments):
+        return None
+    xs = segments[:, 0::2]
+    ys = segments[:, 1::2]
+    return float(xs.min()), float(ys.min()), float(xs.max()), float(ys.max())
+
+
+def merge_bounds(first, second):
+    if first is None:
+        return second
+    if second is None:
+        return first
+    return (min(first[0], second[0]), min(first[1], second[1]),
+            max(first[2], second[2]), max(first[3], second[3]))
+
+
+class SegmentGrid:
+    """Равномерная сетка над рамкой отрезков для выборки по прямоугольнику.
+
+    Отрезок записан во все клетки, которые задевает его рамка. Номера
+    отрезков лежат одним массивом, отсортированным по клеткам, а starts
+    указывает, где начинается каждая клетка.
+    """
+
+    def __init__(self, segments, bounds):
+        self.segments = segments
+        left, top, right, bottom = bounds
+        cells = int(np.sqrt(len(segments) / GRID_SEGMENTS_PER_CELL))
+        self.cells = min(max(cells, 1), GRID_MAX_CELLS)
+        self.left, self.top = left, top
+        self.size = max(right - left, bottom - top, 1e-9) / self.cells
+
+        # Пары (клетка, отрезок) считаются пакетами, чтобы не раздувать память
+        cells, rows = [], []
+        for first in range(0, len(segments), BATCH):
+            cell, row = self.cover(segments[first:first + BATCH])
+            cells.append(cell)
+            rows.append((row + first).astype(np.int32))
+        cell = np.concatenate(cells)
+        order = np.argsort(cell, kind='stable')
+        self.items = np.concatenate(rows)[order]
+        self.starts = np.searchsorted(cell[order], np.arange(self.cells * self.cells + 1))
+
+    def cover(self, segments):
+        """Клетки, которые задевают рамки отрезков, и номера этих отрезков"""
+        first_x, last_x = self.cell_range(np.minimum(segments[:, 0], segments[:, 2]),
+                                          np.maximum(segments[:, 0], segments[:, 2]), self.left)
+        first_y, last_y = self.cell_range(np.minimum(segments[:, 1], segments[:, 3]),
+                                          np.maximum(segments[:, 1], segments[:, 3]), self.top)
+        span_x = last_x - first_x + 1
+        counts = span_x * (last_y - first_y + 1)
+        rows = np.repeat(np.arange(len(segments), dtype=np.int64), counts)
+        offset = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+        span_x = np.repeat(span_x, counts)
+        cell_x = np.repeat(first_x, counts) + offset % span_x
+        cell_y = np.repeat(first_y, counts) + offset // span_x
+        return (cell_y * self.cells + cell_x).astype(np.int32), rows
+
+    def cell_range(self, low, high, origin):
+        first = np.floor((low - origin) / self.size).astype(np.int64)
+        last = np.floor((high - origin) / self.size).astype(np.int64)
+        return (np.clip(first, 0, self.cells - 1), np.clip(last, 0, self.cells - 1))
+
+    def query(self, left, top, right, bottom):
+        """Номера отрезков, рамка которых пересекает прямоугольник, по порядку обхода"""
+        (first_x,), (last_x,) = self.cell_range(np.array([left]), np.array([right]), self.left)
+        (first_y,), (last_y,) = self.cell_range(np.array([top]), np.array([bottom]), self.top)
+        parts = [
+            self.items[self.starts[row * self.cells + first_x]:self.starts[row * self.cells + last_x + 1]]
+            for row in range(first_y, last_y + 1)
+        ]
+        found = np.unique(np.concatenate(parts))
+        segments = self.segments[found]
+        inside = ((np.maximum(segments[:, 0], segments[:, 2]) >= left)
+                  & (np.minimum(segments[:, 0], segments[:, 2]) <= right)
+                  & (np.maximum(segments[:, 1], segments[:, 3]) >= top)
+                  & (np.minimum(segments[:, 1], segments[:, 3]) <= bottom))
+        return found[inside]
+
+    @property
+    def nbytes(self):
+        return self.items.nbytes + self.starts.nbytes
+
+
+class TurtleGeometry:
+    """Отрезки шага в координатах модели (шаг черепахи = 1) и их рамка"""
+
+    def __init__(self, segments):
+        self.segments = segments
+        self.bounds = segment_bounds(segments)
+        self.lod_scale = None
+        self.lod_segments = None
+        self.grid = None
+
+    def index(self):
+        """Пространственный индекс отрезков; строится при первом обращении"""
+        if self.grid is None and self.bounds is not None:
+            self.grid = SegmentGrid(self.segments, self.bounds)
+        return self.grid
+
+    def visible(self, left, top, right, bottom):
+        """Отрезки, задевающие прямоугольник модели, в порядке обхода"""
+        grid = self.index()
+        if grid is None:
+            return self.segments
+        return self.segments[grid.query(left, top, right, bottom)]
+
+    def simplified(self, scale):
+        """Упрощённые отрезки для масштаба; последний результат запоминается"""
+        if scale != self.lod_scale:
+            self.lod_segments = simplify_segments(self.segments, scale)
+            self.lod_scale = scale
+        return self.lod_segments
+
+    @property
+    def nbytes(self):
+        size = self.segments.nbytes
+        if self.lod_segments is not None:
+            size += self.lod_segments.nbytes
+        if self.grid is not None:
+            size += self.grid.nbytes
+        return size
@@ -0,0 +1,96 @@
+# build_ui.py
+"""Генерация модулей *_ui.py из .ui всех заданий.
+
+Приложения импортируют готовые классы Ui_MainWindow из модулей pyuic,
+которые лежат рядом с .ui: это быстрее, чем разбирать XML через loadUi
+при каждом запуске. Сами приложения модули не пишут, их обновляет этот
+скрипт после правки .ui. Модуль переписывается, только если изменился
+сгенерированный код; строки комментариев pyuic (путь к .ui, версия)
+при сравнении не учитываются.
+
+К коду pyuic дописывается проверка UI_CHECK: если при импорте модуля .ui
+оказался новее него, класс собирается из .ui через uic.loadUiType, а в
+stderr выводится напоминание запустить этот скрипт.
+
+Примеры:
+    python build_ui.py
+    python build_ui.py --check
+"""
+import io
+import os
+import sys
+import argparse
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+
+UI_CHECK = '''
+
+# Дописано build_ui.py: .ui правили после генерации, а модуль не пересобрали
+import sys as _sys
+from pathlib import Path as _Path
+
+_ui_file = _Path(__file__).with_name({ui_name!r})
+if _ui_file.exists() and _ui_file.stat().st_mtime > _Path(__file__).stat().st_mtime:
+    from PyQt5 import uic as _uic
+    print(f"{{_ui_file.name}} новее {{_Path(__file__).name}}, интерфейс собран из .ui; "
+          "обновите модули: python build_ui.py", file=_sys.stderr)
+    Ui_MainWindow, _ = _uic.loadUiType(str(_ui_file))
+'''
+
+
+def compiled_path(ui_file):
+    """Путь к модулю pyuic для файла .ui: editor.ui -> editor_ui.py"""
+    return ui_file.with_name(f"{ui_file.stem}_ui.py")
+
+
+def generate(ui_file):
+    from PyQt5.uic import compileUi
+
+    # pyuic пишет имя файла в шапку модуля: путь от корня не зависит от машины
+    source = io.BytesIO(ui_file.read_bytes())
+    source.name = ui_file.relative_to(ROOT).as_posix()
+    code = io.StringIO()
+    compileUi(source, code)
+    return code.getvalue() + UI_CHECK.format(ui_name=ui_file.name)
+
+
+def _code_lines(text):
+    return [line for line in text.splitlines() if not line.startswith('#')]
+
+
+def is_stale(ui_file, code):
+    """Отличается ли сгенерированный код от модуля на диске"""
+    module_file = compiled_path(ui_file)
+    if not module_file.exists():
+        return True
+    return _code_lines(module_file.read_text(encoding='utf-8')) != _code_lines(code)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Генерация модулей *_ui.py из .ui")
+    parser.add_argument("--check", action="store_true",
+                        help="только проверить, код возврата 1 - если есть устаревшие модули")
+    args = parser.parse_args(argv)
+
+    stale = []
+    for ui_file in sorted(ROOT.glob("*/*.ui")):
+        code = generate(ui_file)
+        if not is_stale(ui_file, code):
+            # .ui сохранили без изменений: модуль верен, но проверка в нём сочла бы его устаревшим
+            module_file = compiled_path(ui_file)
+            if not args.check and ui_file.stat().st_mtime > module_file.stat().st_mtime:
+                os.utime(module_file)
+            continue
+        stale.append(ui_file)
+        if not args.check:
+            compiled_path(ui_file).write_text(code, encoding='utf-8')
+        print(f"{'устарел' if args.check else 'обновлён'}: {compiled_path(ui_file).relative_to(ROOT)}")
+
+    if not stale:
+        print("Все модули интерфейса актуальны")
+    return 1 if args.check and stale else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,258 @@
+# launcher.py
+"""Все восемь заданий в одном процессе.
+
+Лаунчер держит один QApplication и открывает инструменты по требованию:
+вкладкой или отдельным окном. Модуль задания импортируется при первом
+открытии, поэтому сам лаунчер стартует быстро, а повторное открытие
+только создаёт окно. Открытый инструмент не создаётся второй раз -
+лаунчер переключается на него.
+
+Примеры:
+    python launcher.py
+    python launcher.py --open 8zadanie --windows
+    python launcher.py --benchmark
+"""
+import time
+
+STARTED = time.perf_counter()
+
+import os
+import sys
+import argparse
+import importlib.util
+from pathlib import Path
+from PyQt5.QtWidgets import (
+    QApplication, QMainWindow, QListWidget, QListWidgetItem, QTabWidget, QSplitter,
+    QCheckBox, QToolBar, QMessageBox,
+)
+from PyQt5.QtCore import QEvent, QObject, Qt
+
+ROOT = Path(__file__).resolve().parent
+
+# Время от запуска до первой отрисовки лаунчера, в секундах
+STARTUP_BUDGET = 0.3
+
+
+class Tool:
+    """Задание из папки репозитория; модуль грузится при первом create()"""
+
+    def __init__(self, folder, class_name, title, **options):
+        self.folder = folder
+        self.class_name = class_name
+        self.title = title
+        self.options = options
+        self.window_class = None
+        self.import_time = None
+
+    def load(self):
+        if self.window_class is None:
+            started = time.perf_counter()
+            app_dir = ROOT / self.folder
+            # Соседние модули задания импортируются по простым именам
+            if str(app_dir) not in sys.path:
+                sys.path.insert(0, str(app_dir))
+            spec = importlib.util.spec_from_file_location(f"{self.folder}_main", app_dir / "main.py")
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            self.window_class = getattr(module, self.class_name)
+            self.import_time = time.perf_counter() - started
+        return self.window_class
+
+    def create(self):
+        return self.load()(**self.options)
+
+
+TOOLS = [
+    Tool("1zadanie", "NumberAnalyzer", "Анализ чисел"),
+    Tool("2zadanie", "TextEditor", "Текстовый редактор"),
+    Tool("3zadanie", "ImageEditor", "Редактор изображений"),
+    Tool("4zadanie", "TransparencyEditor", "Регулятор прозрачности изображения"),
+    Tool("5zadanie", "FlagGenerator", "Генератор полосатого флага",
+         cache_dir=os.environ.get("FLAG_CACHE_DIR")),
+    Tool("6zadanie", "SmileyApp", "Смайлик"),
+    Tool("7zadanie", "PianoApp", "Виртуальное фортепиано"),
+    Tool("8zadanie", "LSystemApp", "L-system"),
+]
+
+
+class CloseWatcher(QObject):
+    """Запоминает окна, закрытые прямо в конструкторе (отмена диалога при запуске)"""
+
+    def __init__(self, window_class):
+        super().__init__()
+        self.window_class = window_class
+        self.closed = False
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Close and isinstance(obj, self.window_class):
+            self.closed = True
+        return False
+
+
+class FirstPaint(QObject):
+    """Вызывает callback при первой отрисовке окна"""
+
+    def __init__(self, callback):
+        super().__init__()
+        self.callback = callback
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint and self.callback is not None:
+            callback, self.callback = self.callback, None
+            callback()
+        return False
+
+
+class Launcher(QMainWindow):
+    def __init__(self, tools=TOOLS):
+        super().__init__()
+        self.setWindowTitle("Домашние задания")
+        self.resize(1000, 650)
+        self.tools = tools
+        self.open_windows = {}  # папка -> окно инструмента
+
+        self.tool_list = QListWidget()
+        for tool in tools:
+            item = QListWidgetItem(tool.title)
+            item.setData(Qt.UserRole, tool)
+            self.tool_list.addItem(item)
+        self.tool_list.itemActivated.connect(lambda item: self.open_tool(item.data(Qt.UserRole)))
+
+        self.tabs = QTabWidget()
+        self.tabs.setTabsClosable(True)
+        self.tabs.setDocumentMode(True)
+        self.tabs.tabCloseRequested.connect(lambda index: self.tabs.widget(index).close())
+
+        splitter = QSplitter()
+        splitter.addWidget(self.tool_list)
+        splitter.addWidget(self.tabs)
+        splitter.setStretchFactor(1, 1)
+        splitter.setSizes([220, 780])
+        self.setCentralWidget(splitter)
+
+        toolbar = QToolBar()
+        toolbar.setMovable(False)
+        self.separate_windows = QCheckBox("Открывать в отдельных окнах")
+        toolbar.addWidget(self.separate_windows)
+        self.addToolBar(toolbar)
+
+        self.first_paint = FirstPaint(self.report_startup)
+        self.installEventFilter(self.first_paint)
+
+    def report_startup(self):
+        elapsed = time.perf_counter() - STARTED
+        message = f"Лаунчер запущен за {elapsed * 1000:.0f} мс"
+        if elapsed > STARTUP_BUDGET:
+            message += f" (бюджет {STARTUP_BUDGET * 1000:.0f} мс превышен)"
+            print(message, file=sys.stderr)
+        # Инструменты из --open могли успеть открыться раньше: их строку не затираем
+        if not self.statusBar().currentMessage():
+            self.statusBar().showMessage(message)
+
+    def open_tool(self, tool):
+        """Показывает инструмент; при первом открытии импортирует его модуль"""
+        window = self.open_windows.get(tool.folder)
+        if window is not None:
+            self.activate(window)
+            return window
+
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            loaded = tool.window_class is not None
+            window_class = tool.load()
+            started = time.perf_counter()
+            watcher = CloseWatcher(window_class)
+            QApplication.instance().installEventFilter(watcher)
+            try:
+                window = tool.create()
+            finally:
+                QApplication.instance().removeEventFilter(watcher)
+            created = time.perf_counter() - started
+        except Exception as e:
+            QMessageBox.critical(self, "Ошибка", f"Не удалось открыть «{tool.title}»:\n{e}")
+            return None
+        finally:
+            QApplication.restoreOverrideCursor()
+
+        if watcher.closed:
+            # Инструмент сам отказался запускаться, например без выбранного файла
+            window.deleteLater()
+            return None
+
+        if window.windowTitle() in ("", "MainWindow"):
+            window.setWindowTitle(tool.title)
+        window.setAttribute(Qt.WA_DeleteOnClose)
+        window.destroyed.connect(lambda: self.forget(tool.folder))
+        self.open_windows[tool.folder] = window
+
+        if self.separate_windows.isChecked():
+            window.show()
+        else:
+            window.setWindowFlags(Qt.Widget)
+            index = self.tabs.addTab(window, window.windowTitle())
+            window.windowTitleChanged.connect(
+                lambda title: self.tabs.setTabText(self.tabs.indexOf(window), title)
+            )
+            self.tabs.setCurrentIndex(index)
+            window.show()
+
+        timings = f"окно {created * 1000:.0f} мс"
+        if not loaded:
+            timings = f"импорт {tool.import_time * 1000:.0f} мс, " + timings
+        self.statusBar().showMessage(f"{tool.title}: {timings}")
+        return window
+
+    def activate(self, window):
+        index = self.tabs.indexOf(window)
+        if index >= 0:
+            self.tabs.setCurrentIndex(index)
+        else:
+            window.showNormal()
+            window.raise_()
+            window.activateWindow()
+
+    def forget(self, folder):
+        self.open_windows.pop(folder, None)
+
+    def closeEvent(self, event):
+        # Инструмент может отказаться закрываться, например из-за несохранённого текста
+        for window in list(self.open_windows.values()):
+            if not window.close():
+                event.ignore()
+                return
+        super().closeEvent(event)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Все задания в одном окне")
+    parser.add_argument("--open", nargs="+", default=[], choices=[tool.folder for tool in TOOLS],
+                        help="сразу открыть инструменты")
+    parser.add_argument("--windows", action="store_true", help="открывать в отдельных окнах")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="вывести время запуска и открытия инструментов и выйти")
+    args = parser.parse_args(argv)
+
+    app = QApplication(sys.argv[:1])
+    launcher = Launcher()
+    launcher.separate_windows.setChecked(args.windows)
+    launcher.show()
+
+    if args.benchmark:
+        while launcher.first_paint.callback is not None:
+            app.processEvents()
+        print(f"Лаунчер запущен за {(time.perf_counter() - STARTED) * 1000:.0f} мс")
+        for tool in TOOLS:
+            if tool.folder in args.open:
+                launcher.open_tool(tool)
+                print(launcher.statusBar().currentMessage())
+        launcher.close()
+        return 0
+
+    for tool in TOOLS:
+        if tool.folder in args.open:
+            launcher.open_tool(tool)
+    return app.exec()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
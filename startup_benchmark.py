@@ -0,0 +1,153 @@
+# startup_benchmark.py
+"""Время запуска всех восьми заданий.
+
+Каждое приложение запускается в отдельном процессе несколько раз, и для
+него замеряются импорт main.py, построение окна и время до первой
+отрисовки окна после show(). Для сравнения те же замеры делаются с
+классом окна, который собирается из .ui через uic.loadUiType при
+импорте, вместо модуля pyuic. Выводится медиана.
+
+Примеры:
+    python startup_benchmark.py
+    python startup_benchmark.py --repeat 10 --apps 1zadanie 8zadanie
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+import importlib.util
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+
+# Папка -> (класс окна, файл для диалога открытия в конструкторе)
+APPS = {
+    "1zadanie": ("NumberAnalyzer", None),
+    "2zadanie": ("TextEditor", None),
+    "3zadanie": ("ImageEditor", "image.png"),
+    "4zadanie": ("TransparencyEditor", None),
+    "5zadanie": ("FlagGenerator", None),
+    "6zadanie": ("SmileyApp", None),
+    "7zadanie": ("PianoApp", None),
+    "8zadanie": ("LSystemApp", "test.txt"),
+}
+
+STAGES = ("qt", "import", "construct", "paint")
+
+# Сколько ждать первой отрисовки, в секундах
+PAINT_TIMEOUT = 10
+
+
+def measure(folder, load_ui_file):
+    """Замер одного запуска в текущем процессе; печатает JSON со временами этапов"""
+    started = time.perf_counter()
+    from PyQt5.QtCore import QObject, QEvent
+    from PyQt5.QtWidgets import QApplication, QFileDialog, QMessageBox
+    app = QApplication(sys.argv[:1])
+    qt_ready = time.perf_counter()
+
+    app_dir = ROOT / folder
+    class_name, open_file = APPS[folder]
+    # Диалоги в конструкторе без пользователя не закроются: отвечаем за него
+    answer = str(app_dir / open_file) if open_file else ""
+    QFileDialog.getOpenFileName = staticmethod(lambda *args, **kwargs: (answer, ""))
+    for name in ("critical", "warning", "information"):
+        setattr(QMessageBox, name, staticmethod(lambda *args, **kwargs: QMessageBox.Ok))
+
+    sys.path.insert(0, str(app_dir))
+    os.chdir(app_dir)
+    if load_ui_file:
+        # Подменяем модуль pyuic классом, собранным из XML, как без сгенерированного модуля
+        import types
+        from PyQt5 import uic
+        ui_file = next(app_dir.glob("*.ui"))
+        module = types.ModuleType(f"{ui_file.stem}_ui")
+        module.Ui_MainWindow, _ = uic.loadUiType(str(ui_file))
+        sys.modules[module.__name__] = module
+    spec = importlib.util.spec_from_file_location("main", app_dir / "main.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    imported = time.perf_counter()
+
+    window = getattr(module, class_name)()
+    constructed = time.perf_counter()
+
+    class PaintWatcher(QObject):
+        painted = None
+
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint and self.painted is None:
+                self.painted = time.perf_counter()
+            return False
+
+    watcher = PaintWatcher()
+    window.installEventFilter(watcher)
+    window.show()
+    while watcher.painted is None and time.perf_counter() - constructed < PAINT_TIMEOUT:
+        app.processEvents()
+
+    times = {
+        "qt": qt_ready - started,
+        "import": imported - qt_ready,
+        "construct": constructed - imported,
+        "paint": (watcher.painted or time.perf_counter()) - constructed,
+    }
+    print(json.dumps(times))
+    sys.stdout.flush()
+    # Потоки и аудио некоторых заданий не мешают выходу
+    os._exit(0)
+
+
+def run_child(folder, load_ui_file):
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    command = [sys.executable, str(Path(__file__).resolve()), "--child", folder]
+    if load_ui_file:
+        command.append("--load-ui-file")
+    result = subprocess.run(
+        command,
+        env=env, capture_output=True, text=True, timeout=60,
+    )
+    for line in reversed(result.stdout.splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    lines = result.stderr.strip().splitlines()
+    raise RuntimeError(lines[-1] if lines else f"код выхода {result.returncode}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Время запуска заданий: импорт, окно, первая отрисовка")
+    parser.add_argument("--repeat", type=int, default=5, help="запусков на приложение и режим")
+    parser.add_argument("--apps", nargs="+", choices=sorted(APPS), default=sorted(APPS))
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--load-ui-file", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        measure(args.child, args.load_ui_file)
+        return 0
+
+    header = f"{'задание':<10} {'режим':<8}" + "".join(f"{stage:>11}" for stage in STAGES) + f"{'всего':>11}"
+    print(header)
+    print("-" * len(header))
+    for folder in args.apps:
+        # Прогревочный запуск: заполняет __pycache__
+        try:
+            run_child(folder, False)
+        except (RuntimeError, subprocess.TimeoutExpired) as e:
+            print(f"{folder:<10} не запустилось: {e}")
+            continue
+        for mode, load_ui_file in (("pyuic", False), ("loadUi", True)):
+            runs = [run_child(folder, load_ui_file) for _ in range(args.repeat)]
+            medians = {stage: statistics.median(run[stage] for run in runs) for stage in STAGES}
+            print(f"{folder:<10} {mode:<8}"
+                  + "".join(f"{medians[stage] * 1000:>9.1f}мс" for stage in STAGES)
+                  + f"{sum(medians.values()) * 1000:>9.1f}мс")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())